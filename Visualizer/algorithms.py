@@ -1,170 +1,106 @@
-import pygame
-import settings
-from queue import PriorityQueue
-from random import choice
+import engine
+import tour
+import parallel
+from grids import Grid, PATH, OPEN, CLOSED
+from stats import Stats
 
-directions = [(0, -1), (1, 0), (0, 1), (-1, 0)] #[up, right, down, left]
-ACROSS = settings.ACROSS
+#Jobs the visualizer runs with worker.Job: each takes the job last and runs on its thread
+#They never touch the board's cells, the observers turn what they are told into (index, state) events for job.emit
+#and the window's Frames plays them. job.emit returns an escape code once the job is cancelled, which stops the search it was called from
 
-def exit():
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            return 1
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_BACKSPACE:
-                return 2
-    return 0
+def draw_step(job): #Observer that animates a search
+    def observer(opened, closed):
+        return job.emit([(index, OPEN) for index in opened] + [(index, CLOSED) for index in closed])
+    return observer
 
-def get_path(came_from, current):
-    result = [current]
-    while current in came_from:
-        current = came_from[current]
-        result.append(current)
-    return result
+def draw_path(job, nodes):
+    return job.emit([(node.index, PATH) for node in nodes if not node.is_destination()])
 
-def astar(grid, start, end):
-    count = 0
-    open = PriorityQueue()
-    open.put((0, count, start))
-    came_from = {}
-    g_cost = {start: 0}
-    f_cost = {start: start.distance(end)}
-    open_hash = {start}
-    while not open.empty():
-        escape = exit()
-        if escape:
-            return escape
-        current = open.get()[2]
-        open_hash.remove(current)
-        if current == end:
-            return g_cost[current], get_path(came_from, current)
-        current.update_neighbors(grid)
-        x1, y1 = current.get_pos()
-        for neighbor in current.get_neighbors():
-            x2, y2 = neighbor.get_pos()
-            new_g_cost = g_cost[current] + 10 + 4*((abs(x1 - x2) + abs(y1 - y2) + 1)%2)
-            if not neighbor in g_cost or new_g_cost < g_cost[neighbor]:
-                g_cost[neighbor] = new_g_cost
-                f_cost[neighbor] = g_cost[neighbor] + neighbor.distance(end)
-                came_from[neighbor] = current
-                if not neighbor in open_hash:
-                    count += 1
-                    open.put((f_cost[neighbor], count, neighbor))
-                    open_hash.add(neighbor)
-                    if not (neighbor.is_path() or neighbor.is_destination()):
-                        neighbor.set_open()
-        grid.draw()
-        if not (current.is_path() or current.is_destination()):
-            current.set_closed()
-    return False
+def show_sweeps(job): #Observer for parallel sweeps: marks the paths of each sweep as it comes back
+    def observer(source, found):
+        return job.emit([(node.index, OPEN) for cost, path in found.values() for node in path] if found else [])
+    return observer
+
+def search(grid, method, job): #Start to each flag in turn and on to the end, returns (cost or None if there is no path, stats of every search)
+    total = Stats()
+    distance = 0
+    prev = grid.get_start()
+    for next in grid.get_flags_end():
+        result = engine.METHODS[method](grid, prev, next, draw_step(job))
+        if job.is_cancelled():
+            return None, total
+        cost, path, stats = result
+        if method == 'alt': #Plain octile A* on the same leg, for the sidebar to show what the landmarks saved
+            stats.octile = engine.astar(grid, prev, next)[2].expanded
+        total.add(stats)
+        if not path: #Path not found
+            return None, total
+        distance += cost
+        if draw_path(job, path[::-1]):
+            return None, total
+        prev = next
+    return distance, total
 
-def dijkstra(grid, start, end):
-    count = 0
-    open = PriorityQueue()
-    open.put((0, count, start))
-    open_hash = {start}
+def visit_flags(grid, heuristic, pool, job): #Shortest route from the start through every flag to the end, returns (cost or None, stats)
+    total = Stats()
+    sources = [grid.get_start()] + grid.get_flags()
+    #One sweep per source settles all of its later flags and the end
+    sweeps = [(sources[i], grid.get_flags() if i == 0 else grid.get_flags_end()[i:]) for i in range(len(sources))]
+    if pool: #All sweeps at once in worker processes
+        found = parallel.search_pairs(grid, sweeps, heuristic, observer=show_sweeps(job))
+    else:
+        found = []
+        for prev, targets in sweeps:
+            result = engine.search_many(grid, prev, targets, draw_step(job), heuristic=heuristic)
+            if job.is_cancelled():
+                break
+            found.append((prev,) + result)
+            if len(result[0]) < len(targets): #Path not found
+                break
+    if job.is_cancelled():
+        return None, total
+    costs = {}
     came_from = {}
-    while not open.empty():
-        escape = exit()
-        if escape:
-            return escape
-        current_cost, dummy, current = open.get()
-        if current == end:
-            return current_cost, get_path(came_from, current)
-        current.update_neighbors(grid)
-        x1, y1 = current.get_pos()
-        for neighbor in current.get_neighbors():
-            if not neighbor in open_hash:
-                x2, y2 = neighbor.get_pos()
-                new_cost = current_cost + 10 + 4*((abs(x1 - x2) + abs(y1 - y2) + 1)%2)
-                count += 1
-                open.put((new_cost, count, neighbor))
-                open_hash.add(neighbor)
-                came_from[neighbor] = current
-                if not (neighbor.is_path() or neighbor.is_destination()):
-                        neighbor.set_open()
-        grid.draw()
-        if not (current.is_path() or current.is_destination()):
-            current.set_closed()
-    return False
+    for prev, reached, stats in found:
+        total.add(stats)
+        for next in reached:
+            costs[(prev, next)], came_from[(prev, next)] = reached[next]
+    if len(costs) < sum(len(targets) for prev, targets in sweeps):
+        return None, total
+    path, distance = shortest_path(costs, grid.get_start(), grid.get_flags(), grid.get_end())
+    nodes = []
+    connect = grid.get_start()
+    for key in path:
+        steps = came_from[key] if came_from[key][0] == connect else came_from[key][::-1]
+        nodes += steps
+        connect = steps[-1]
+    draw_path(job, nodes)
+    return distance, total
 
 #costs: a dictionary with key as tuple of connected nodes and value as distance between them
-def shortest_path(costs, flags, visited, next, end, path, distance):
-    if len(path) < flags:
-        current = (path, distance)
-        distance = 0
-        for key in costs:
-            if visited.isdisjoint(set(key)) and next in key and not end in key:
-                final_path, final_distance = shortest_path(costs, flags, visited.union({next}), key[(key.index(next)+1)%2], end, current[0]+[key], current[1]+costs[key])
-                if final_distance < distance or not bool(distance):
-                    distance = final_distance
-                    path = final_path
-    else:
-        key = (next, end)
-        path.append(key)
-        distance += costs[key]
+def shortest_path(costs, start, flags, end): #Order the flags with tour.solve, returns the keys of costs along the route and its length
+    nodes = [start] + flags + [end]
+    dist = [[0 if a == b else costs.get((a, b), costs.get((b, a), tour.INF)) for b in nodes] for a in nodes]
+    route, distance = tour.solve(dist, 0, len(nodes)-1)
+    path = []
+    for i in range(len(route)-1):
+        key = (nodes[route[i]], nodes[route[i+1]])
+        path.append(key if key in costs else key[::-1])
     return path, distance
 
-def maze(pos, grid): #Generate maze by making walls
-    grid.draw()
-    x, y = pos
-    d = directions.copy()
-    while bool(d):
-        escape = exit()
-        if escape:
-            return escape
-        x1, y1 = d.pop(d.index(choice(d)))
-        for i in range(-1, 2):
-            new_x = x+x1+i*abs(y1)
-            new_y = y+y1+i*abs(x1)
-            if not (grid.valid_pos((new_x, new_y)) and grid.valid_pos((new_x+x1, new_y+y1))):
-                break
-        else:
-            if not grid.get_node((x+x1, y+y1)).is_destination():
-                grid.get_node((x+x1, y+y1)).set_wall()
-                stop = maze((x+x1, y+y1), grid)
-                if stop:
-                    return stop
-    return False
+def get_board(grid): #Everything Grid.set_board needs to put the grid back
+    return bytes(grid.cells), grid.get_start().index, grid.get_end().index, [flag.index for flag in grid.get_flags()]
 
-def grow_tree(grid, mode): #Generate maze by removing walls
-    grid.reset()
-    nodes = {}
-    d = {(x*2, y*2) for x, y in directions}
-    for i in range(0, ACROSS):
-        for j in range(i, ACROSS):
-            if i%2 == 1 or j%2 == 1:
-                grid.get_node((i, j)).set_wall()
-                grid.get_node((j, i)).set_wall()
-            else:
-                nodes[grid.get_node((i, j))] = {grid.get_node((i+v, j+h)) for v, h in d if grid.valid_pos((i+v, j+h))}
-                nodes[grid.get_node((j, i))] = {grid.get_node((j+v, i+h)) for v, h in d if grid.valid_pos((j+v, i+h))}
-        grid.draw()
-    if mode:
-        next_node = lambda: check[len(check)-1]
-    else:
-        next_node = lambda: check[check.index(choice(check))]        #1
-        # get_node = lambda: check[check.index(set(check).pop())]   #2
-    check = [set(nodes.keys()).pop()]
-    removed = set()
-    while bool(check):
-        escape = exit()
-        if escape:
-            return escape
-        grid.draw()
-        current = next_node()
-        neighbors = nodes.get(current)
-        neighbors = neighbors.difference(set(check).union(removed))
-        if bool(neighbors):
-            neighbor = choice(list(neighbors))    #1
-            neighbors.remove(neighbor)            #1
-            # neighbor = neighbors.pop()          #2
-        if not bool(neighbors):
-            check.remove(current)
-            removed.add(current)
-        if not (neighbor in check or neighbor in removed):
-            check.append(neighbor)
-            x1, y1 = current.get_pos()
-            x2, y2 = neighbor.get_pos()
-            grid.get_node((x1+(x2-x1)//2, y1+(y2-y1)//2)).set_default()
-    return False
+def generate(grid, generator, args, job): #Maze generator job, generator(grid, *args) on a copy of the board
+    #The board only gets events: first the board the generator starts from, then the cells it changes
+    copy = Grid(grid.cols, grid.rows)
+    copy.set_board(*get_board(grid))
+    sent = []
+    def observer(events):
+        if not sent:
+            sent.append(True)
+            events = [(None, get_board(copy))] + events
+        return job.emit(events)
+    generator(copy, *args, observer=observer)
+    if not (sent or job.is_cancelled()): #Nothing to animate, the starting board is the maze
+        job.emit([(None, get_board(copy))])
@@ -0,0 +1,73 @@
+from array import array
+from flow import Field, INF
+from stats import Stats
+
+#ALT (A*, Landmarks, Triangle inequality): exact distances from a few landmark cells bound the distance between any two cells,
+#d(n, goal) >= |d(L, goal) - d(L, n)| for every landmark L, which is far tighter than octile around walls
+#The landmarks are picked by farthest point selection, each one the cell farthest from those before it, and their
+#distances are built with flow.Field (moves are symmetric, so the distance from L is the distance to L)
+#They are kept per grid and only built again once grid.version says the walls changed
+
+LANDMARKS = 8 #Each one is a Dijkstra over the whole grid per wall layout and a few lookups per push
+
+class Landmarks:
+    def __init__(self, grid, count=LANDMARKS, queue='heap'):
+        self.grid = grid
+        self.count = count
+        self.queue = queue
+        self.version = None #grid.version the distances were built for
+        self.indices = [] #Landmark cells
+        self.distances = [] #array('i') per landmark, INF for cells it cannot reach
+        self.stats = None #Of the last build, until a query is charged with it
+
+    def update(self): #Builds again if the walls changed since the last build
+        if self.version != self.grid.version:
+            self.build()
+
+    def spread(self, source): #Distances from source to every cell
+        field = Field(self.grid, source, self.queue)
+        field.close()
+        self.stats.add(field.stats)
+        return field.distance
+
+    def build(self):
+        grid = self.grid
+        self.stats = Stats()
+        self.indices, self.distances = [], []
+        self.version = grid.version
+        free = [index for index in range(len(grid.cells)) if grid.moves[index]]
+        if not free:
+            return
+        #The first landmark is the cell farthest from an arbitrary one, then each is the cell farthest from every landmark so far
+        #Cells no landmark reaches count as the farthest, so every part of a split grid gets one
+        closest = self.spread(free[0])
+        while len(self.indices) < self.count:
+            landmark = max(free, key=closest.__getitem__)
+            if closest[landmark] == 0: #Every free cell is a landmark already
+                break
+            distance = self.spread(landmark)
+            self.indices.append(landmark)
+            self.distances.append(distance)
+            closest = array('i', map(min, closest, distance)) if len(self.indices) > 1 else distance
+        self.stats.stop()
+
+    def get_heuristic(self, goal): #h(index, goal) for engine.astar with this goal: the largest landmark bound, octile if that is larger
+        octile = self.grid.distance
+        bounds = [(distance, distance[goal]) for distance in self.distances if distance[goal] != INF]
+        def h(index, goal):
+            best = octile(index, goal)
+            for distance, to_goal in bounds:
+                bound = distance[index] - to_goal
+                if bound < 0:
+                    bound = -bound
+                if bound > best and distance[index] != INF:
+                    best = bound
+            return best
+        return h
+
+def get_landmarks(grid, queue='heap'): #The grid's landmarks, built for its current walls
+    landmarks = grid.caches.get('alt')
+    if landmarks is None:
+        landmarks = grid.caches['alt'] = Landmarks(grid, queue=queue)
+    landmarks.update()
+    return landmarks
@@ -0,0 +1,180 @@
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import grids
+import engine
+import mazes
+import tour
+from stats import Stats
+from queues import QUEUES
+
+#Seeded benchmark suite: python bench.py [-o results.json] [-b baseline.json]
+#Every board is rebuilt from its seed, so two runs search exactly the same corpus and the counters must match
+#Times are the best of --repeat runs, peak memory is measured on a separate traced run so it does not slow the timed ones
+#With --baseline the exit status is 1 if any time or memory grew by more than --tolerance (times also by more than --slack ms)
+#or any counter grew at all
+
+SIZES = (31, 51, 101)
+DENSITIES = (0.1, 0.2, 0.3)
+FLAGS = 6 #Flags placed for the shortest path runs
+GENERATORS = ('kruskal', 'wilson', 'eller') #Boards from the tree generators that take (grid, seed)
+COUNTERS = ('expanded', 'pushes', 'pops', 'stale', 'max_open')
+
+def random_board(size, density, seed):
+    grid = grids.Grid(size)
+    rng = random.Random(seed)
+    for index in range(len(grid.cells)):
+        node = grid.get_node_at(index)
+        if rng.random() < density and not node.is_destination():
+            node.set_wall()
+    return grid
+
+def maze_board(size, seed):
+    grid = grids.Grid(size)
+    mazes.maze(grid, seed=seed)
+    return grid
+
+def tree_board(size, mode, seed):
+    grid = grids.Grid(size)
+    mazes.grow_tree(grid, mode, seed)
+    return grid
+
+def generated_board(size, generate, seed):
+    grid = grids.Grid(size)
+    generate(grid, seed)
+    return grid
+
+def corpus(seed=0): #[(name, build)], build() makes the board again from its seed
+    boards = []
+    for size in SIZES:
+        boards.append(('open-%d' % size, lambda size=size: grids.Grid(size)))
+        for density in DENSITIES:
+            boards.append(('random-%d-%d' % (size, density*100), lambda size=size, density=density: random_board(size, density, seed)))
+        boards.append(('maze-%d' % size, lambda size=size: maze_board(size, seed)))
+        boards.append(('recursive-%d' % size, lambda size=size: tree_board(size, True, seed)))
+        boards.append(('prims-%d' % size, lambda size=size: tree_board(size, False, seed)))
+        for name in GENERATORS:
+            boards.append(('%s-%d' % (name, size), lambda size=size, name=name: generated_board(size, getattr(mazes, name), seed)))
+    return boards
+
+def place_flags(grid, seed): #Flags on free cells, the same ones for the same seed
+    rng = random.Random(seed)
+    free = [index for index in range(len(grid.cells)) if grid.cells[index] == grids.DEFAULT]
+    for index in rng.sample(free, min(FLAGS, len(free))):
+        flag = grid.get_node_at(index)
+        flag.set_flag()
+        grid.add_flag(flag)
+    return grid
+
+def shortest_path(grid, queue='heap'): #Start, flags and end as in main.py: one sweep per source, then the tour
+    stats = Stats()
+    nodes = [grid.get_start()] + grid.get_flags() + [grid.get_end()]
+    dist = [[0 if a == b else tour.INF for b in nodes] for a in nodes]
+    for i in range(len(nodes)-1):
+        found, sweep_stats = engine.search_many(grid, nodes[i], nodes[i+1:], queue=queue, heuristic=True)
+        stats.add(sweep_stats)
+        for j in range(i+1, len(nodes)):
+            if nodes[j] in found:
+                dist[i][j] = dist[j][i] = found[nodes[j]][0]
+    route, cost = tour.solve(dist, 0, len(nodes)-1)
+    return (cost if cost < tour.INF else None), route, stats
+
+def measure(run, repeat, build=lambda: None): #Best time in ms, result of the last run and peak traced memory in KiB
+    #Each run gets a board of its own from build(), made before the clock starts, so what a search caches on a grid
+    #(hpa, lpa, flow, alt, jps) is built and counted by every run instead of only the first
+    best = None
+    for i in range(repeat):
+        board = build()
+        gc.collect()
+        begin = time.perf_counter()
+        result = run(board)
+        elapsed = (time.perf_counter() - begin)*1000
+        best = elapsed if best is None else min(best, elapsed)
+    board = build()
+    gc.collect()
+    tracemalloc.start()
+    run(board)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(best, 3), result, round(peak/1024, 1)
+
+def record(board, method, queue, ms, peak, cost=None, stats=None):
+    entry = {'board': board, 'method': method, 'queue': queue, 'ms': ms, 'peak_kb': peak, 'cost': cost}
+    for name in COUNTERS:
+        entry[name] = getattr(stats, name) if stats else None
+    entry['heap_ops'] = stats.pushes + stats.pops if stats else None
+    return entry
+
+def run(methods, queues, repeat, seed=0):
+    results = []
+    for name, build in corpus(seed):
+        if name.split('-')[0] in ('maze', 'recursive', 'prims') + GENERATORS: #The generators themselves
+            ms, grid, peak = measure(lambda board: build(), repeat)
+            results.append(record(name, 'generate', None, ms, peak))
+        for method in methods:
+            for queue in queues:
+                ms, (cost, path, stats), peak = measure(lambda grid: engine.solve(grid, grid.get_start(), grid.get_end(), method, queue), repeat, build)
+                results.append(record(name, method, queue, ms, peak, cost, stats))
+        flagged = lambda: place_flags(build(), seed)
+        for queue in queues:
+            ms, (cost, route, stats), peak = measure(lambda grid: shortest_path(grid, queue), repeat, flagged)
+            results.append(record(name, 'shortest_path', queue, ms, peak, cost, stats))
+        print('%-16s done' % name, file=sys.stderr)
+    return results
+
+def key(entry):
+    return entry['board'], entry['method'], entry['queue']
+
+def compare(results, baseline, tolerance, slack=1.0): #Returns the regressions as printable lines
+    base = {key(entry): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        old = base.get(key(entry))
+        if old is None:
+            continue
+        label = ' '.join(part for part in key(entry) if part)
+        for name, allowed in (('ms', slack), ('peak_kb', 0)):
+            if old[name] and entry[name] > old[name]*(1 + tolerance) + allowed:
+                regressions.append('%s: %s %.1f -> %.1f (+%.0f%%)' % (label, name, old[name], entry[name], (entry[name]/old[name] - 1)*100))
+        for name in COUNTERS + ('heap_ops',):
+            if old[name] is not None and entry[name] > old[name]:
+                regressions.append('%s: %s %d -> %d' % (label, name, old[name], entry[name]))
+        if old['cost'] != entry['cost']:
+            regressions.append('%s: cost %s -> %s' % (label, old['cost'], entry['cost']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Seeded pathfinding benchmarks')
+    parser.add_argument('-o', '--output', default='bench.json', help='where to write the results')
+    parser.add_argument('-b', '--baseline', help='results of an earlier run to compare against')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, help='allowed growth of time and memory, 0.25 is 25%%')
+    parser.add_argument('--slack', type=float, default=1.0, help='time growth in ms that is never a regression, short runs are noisy')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('-m', '--methods', default='astar,dijkstra', help='comma separated, from: ' + ','.join(engine.METHODS))
+    parser.add_argument('-q', '--queues', default='heap', help='comma separated, from: ' + ','.join(QUEUES))
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    args = parser.parse_args()
+    results = run(args.methods.split(','), args.queues.split(','), args.repeat, args.seed)
+    with open(args.output, 'w') as file:
+        json.dump({'seed': args.seed, 'repeat': args.repeat, 'results': results}, file, indent=1)
+    print('%-16s %-13s %-8s %9s %9s %9s %9s' % ('board', 'method', 'queue', 'ms', 'expanded', 'heap ops', 'peak KiB'))
+    for entry in results:
+        print('%-16s %-13s %-8s %9.2f %9s %9s %9.1f' % (entry['board'], entry['method'], entry['queue'] or '', entry['ms'], entry['expanded'], entry['heap_ops'], entry['peak_kb']))
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline['seed'] != args.seed:
+            sys.exit('baseline was run with seed %d' % baseline['seed'])
+        regressions = compare(results, baseline['results'], args.tolerance, args.slack)
+        for line in regressions:
+            print('REGRESSION ' + line)
+        if regressions:
+            sys.exit(1)
+        print('no regressions against ' + args.baseline)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+from queues import QUEUES
+from stats import Stats
+
+#Bidirectional search: forward from start and backward from end, one expansion each in turn
+#best is the cheapest start-end path seen where the two searches touch
+#A* uses balanced potentials: forward p(v) = (h(v, end) - h(v, start))/2 with the octile h, backward -p(v), so both sides
+#see the same reduced edge costs and the search stops once the two lowest keys in the open lists add up to best
+#(Dijkstra is the same with p = 0). Keys are doubled to stay integers for the bucket queue: 2g + h(v, other) - h(v, own)
+
+INF = float('inf')
+
+def join(grid, came_from, meet): #Path from end back to start through the meeting edge
+    forward, backward = meet
+    path = [backward]
+    while path[-1] in came_from[1]:
+        path.append(came_from[1][path[-1]])
+    path.reverse()
+    if forward != backward:
+        path.append(forward)
+    while path[-1] in came_from[0]:
+        path.append(came_from[0][path[-1]])
+    return [grid.get_node_at(index) for index in path]
+
+def bidirectional(grid, start, end, observer=None, every=1, queue='heap', heuristic=True):
+    origins = (start.index, end.index)
+    table, moves = grid.table, grid.moves
+    p = lambda side, index: grid.distance(index, origins[1-side]) - grid.distance(index, origins[side]) if heuristic else 0
+    stats = Stats()
+    opened, closed = [], []
+    opens = (QUEUES[queue](), QUEUES[queue]())
+    g_cost = ({origins[0]: 0}, {origins[1]: 0})
+    came_from = ({}, {})
+    settled = (set(), set())
+    best, meet = INF, None
+    if origins[0] == origins[1]:
+        best, meet = 0, origins
+    for side in (0, 1):
+        opens[side].push(origins[side], p(side, origins[side]))
+    side = 1
+    while opens[0] and opens[1]:
+        if opens[0].peek()[0] + opens[1].peek()[0] >= 2*best: #No path through what is left in either list beats best
+            break
+        side = 1 - side
+        key, current = opens[side].pop()
+        settled[side].add(current)
+        stats.expanded += 1
+        current_cost = g_cost[side][current]
+        other = g_cost[1-side]
+        for offset, cost in table[moves[current]]:
+            neighbor = current + offset
+            new_cost = current_cost + cost
+            if neighbor in other and new_cost + other[neighbor] < best:
+                best = new_cost + other[neighbor]
+                meet = (current, neighbor) if side == 0 else (neighbor, current)
+            if neighbor in settled[side]:
+                continue
+            old_cost = g_cost[side].get(neighbor)
+            if old_cost is None or new_cost < old_cost:
+                g_cost[side][neighbor] = new_cost
+                came_from[side][neighbor] = current
+                opens[side].push(neighbor, 2*new_cost + p(side, neighbor))
+                if observer and old_cost is None:
+                    opened.append(neighbor)
+        if observer:
+            closed.append(current)
+            if stats.expanded%every == 0:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+                opened, closed = [], []
+    for open in opens:
+        stats.count(open)
+    if observer:
+        escape = stats.observe(observer, opened, closed)
+        if escape:
+            return escape
+    if meet is None:
+        return None, [], stats
+    return best, join(grid, came_from, meet), stats
+
+def bi_astar(grid, start, end, observer=None, every=1, queue='heap'):
+    return bidirectional(grid, start, end, observer, every, queue, True)
+
+def bi_dijkstra(grid, start, end, observer=None, every=1, queue='heap'):
+    return bidirectional(grid, start, end, observer, every, queue, False)
@@ -0,0 +1,150 @@
+from queues import QUEUES
+from stats import Stats
+from jps import jps
+from bidirectional import bi_astar, bi_dijkstra
+from hpa import hpa
+from lpa import lpa
+from flow import flow
+from alt import get_landmarks
+
+#Headless search engine: no pygame calls, the visualizer is just an observer
+#Searches run on cell indices and read neighbors straight from the grid's adjacency index
+#observer(opened, closed) is called every `every` expansions with the indices opened/closed since the last call
+#A truthy return value from the observer stops the search and is returned as is
+#queue picks the open list backend from queues.QUEUES
+
+def get_path(grid, came_from, current):
+    result = [current]
+    while current in came_from:
+        current = came_from[current]
+        result.append(current)
+    return [grid.get_node_at(index) for index in result]
+
+def astar(grid, start, end, observer=None, every=1, queue='heap', h=None): #h(index, end) is the heuristic, octile by default
+    start, end = start.index, end.index
+    h = h or grid.distance
+    table, moves = grid.table, grid.moves
+    stats = Stats()
+    opened, closed = [], []
+    open = QUEUES[queue]()
+    open.push(start, 0)
+    came_from = {}
+    g_cost = {start: 0}
+    while open:
+        current = open.pop()[1]
+        if current == end:
+            stats.count(open)
+            if observer:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+            return g_cost[current], get_path(grid, came_from, current), stats
+        stats.expanded += 1
+        current_cost = g_cost[current]
+        for offset, cost in table[moves[current]]:
+            neighbor = current + offset
+            new_g_cost = current_cost + cost
+            old_g_cost = g_cost.get(neighbor)
+            if old_g_cost is None or new_g_cost < old_g_cost:
+                g_cost[neighbor] = new_g_cost
+                came_from[neighbor] = current
+                open.push(neighbor, new_g_cost + h(neighbor, end))
+                if observer and old_g_cost is None:
+                    opened.append(neighbor)
+        if observer:
+            closed.append(current)
+            if stats.expanded%every == 0:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+                opened, closed = [], []
+    stats.count(open)
+    return None, [], stats
+
+def sweep(grid, start, targets, observer=None, every=1, queue='heap', heuristic=False): #Dijkstra from start until every target index is settled
+    #With heuristic it is A* towards the nearest remaining target, the open list is re-keyed whenever a target settles
+    table, moves = grid.table, grid.moves
+    remaining = set(targets)
+    h = lambda index: min(grid.distance(index, target) for target in remaining) if heuristic else 0
+    stats = Stats()
+    opened, closed = [], []
+    open = QUEUES[queue]()
+    open.push(start, h(start))
+    g_cost = {start: 0}
+    came_from = {}
+    settled = set()
+    while open and remaining:
+        current = open.pop()[1]
+        current_cost = g_cost[current]
+        settled.add(current)
+        if current in remaining:
+            remaining.remove(current)
+            if not remaining:
+                break
+            if heuristic:
+                stats.count(open)
+                items, open = open.items(), QUEUES[queue]()
+                for item in items:
+                    open.push(item, g_cost[item] + h(item))
+        stats.expanded += 1
+        for offset, cost in table[moves[current]]:
+            neighbor = current + offset
+            if neighbor in settled:
+                continue
+            new_cost = current_cost + cost
+            old_cost = g_cost.get(neighbor)
+            if old_cost is None or new_cost < old_cost:
+                g_cost[neighbor] = new_cost
+                came_from[neighbor] = current
+                open.push(neighbor, new_cost + h(neighbor))
+                if observer and old_cost is None:
+                    opened.append(neighbor)
+        if observer:
+            closed.append(current)
+            if stats.expanded%every == 0:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+                opened, closed = [], []
+    stats.count(open)
+    if observer:
+        escape = stats.observe(observer, opened, closed)
+        if escape:
+            return escape
+    return g_cost, came_from, settled, stats
+
+def dijkstra(grid, start, end, observer=None, every=1, queue='heap'):
+    result = sweep(grid, start.index, [end.index], observer, every, queue)
+    if type(result) is int:
+        return result
+    g_cost, came_from, settled, stats = result
+    if not end.index in settled:
+        return None, [], stats
+    return g_cost[end.index], get_path(grid, came_from, end.index), stats
+
+def search_many(grid, start, targets, observer=None, every=1, queue='heap', heuristic=False): #One sweep from start for several targets
+    #Returns ({target: (cost, path)}, stats) with unreachable targets left out, paths run from the target back to start
+    result = sweep(grid, start.index, [target.index for target in targets], observer, every, queue, heuristic)
+    if type(result) is int:
+        return result
+    g_cost, came_from, settled, stats = result
+    found = {}
+    for target in targets:
+        if target.index in settled:
+            found[target] = g_cost[target.index], get_path(grid, came_from, target.index)
+    return found, stats
+
+def alt(grid, start, end, observer=None, every=1, queue='heap'): #A* with the landmark bounds of alt.py
+    landmarks = get_landmarks(grid, queue)
+    result = astar(grid, start, end, observer, every, queue, landmarks.get_heuristic(end.index))
+    if type(result) is int:
+        return result
+    if landmarks.stats is not None: #The first query after a build is charged the time of the landmark searches,
+        result[2].search_time += landmarks.stats.search_time #its counters stay its own to compare with other searches
+        landmarks.stats = None
+    return result
+
+METHODS = {'astar': astar, 'dijkstra': dijkstra, 'jps': jps, 'bi-astar': bi_astar, 'bi-dijkstra': bi_dijkstra, 'hpa': hpa, 'lpa': lpa, 'flow': flow, 'alt': alt}
+
+def solve(grid, start, end, method='astar', queue='heap'): #Batch entry point, returns (cost, path, stats), cost is None if unreachable
+    return METHODS[method](grid, start, end, queue=queue)
@@ -0,0 +1,131 @@
+from array import array
+from grids import steps
+from queues import QUEUES
+from stats import Stats
+
+#Flow field: one Dijkstra from the goal over the whole grid gives every cell its distance to the goal and the move to take,
+#so the path of any number of agents heading to that goal is a chain of lookups
+#Moves are symmetric (a diagonal needs a free side either way), so searching out from the goal finds the paths into it
+#Like LPA* the field watches the grid: a wall edit only changes moves inside the 3x3 block around it, so update()
+#clears the cells whose way to the goal went through a changed move and searches again from the cells around them
+
+INF = 2**31 - 1 #Distance of walls and cells that cannot reach the goal
+NONE = 255 #Direction of the goal and of cells without a way to it
+
+class Field:
+    def __init__(self, grid, goal, queue='heap'):
+        self.grid = grid
+        self.goal = goal
+        self.queue = queue
+        self.offsets = [dy*grid.cols + dx for dx, dy in steps]
+        self.pending = set() #Edited cells, None for everything
+        self.version = 0 #Bumped whenever distances change, for whatever draws the field
+        grid.watch(self.pending.add)
+        self.stats = self.build()
+
+    def close(self):
+        self.grid.unwatch(self.pending.add)
+
+    def build(self): #Whole field from the goal
+        self.distance = array('i', [INF])*len(self.grid.cells) #Cost to the goal in the grid's units (10 straight, 14 diagonal)
+        self.direction = bytearray([NONE])*len(self.grid.cells) #k: the next cell is index + offsets[k], steps[k] away
+        self.pending.clear()
+        self.distance[self.goal] = 0
+        return self.search([self.goal])
+
+    def search(self, sources): #Dijkstra out of sources, whose distances are set, lowering any distance it can
+        stats = Stats()
+        grid = self.grid
+        table, moves = grid.table, grid.moves
+        distance, direction = self.distance, self.direction
+        back = {offset: (k + 4)%8 for k, offset in enumerate(self.offsets)} #Offset out of a cell: direction back into it
+        open = QUEUES[self.queue]()
+        for index in sources:
+            open.push(index, distance[index])
+        while open:
+            cost, current = open.pop()
+            stats.expanded += 1
+            for offset, step in table[moves[current]]:
+                neighbor = current + offset
+                if cost + step < distance[neighbor]:
+                    distance[neighbor] = cost + step
+                    direction[neighbor] = back[offset]
+                    open.push(neighbor, cost + step)
+        stats.count(open)
+        self.version += 1
+        return stats
+
+    def update(self): #Repairs the field after wall edits, returns the stats of the repair or None if there were none
+        if not self.pending:
+            return None
+        if None in self.pending:
+            self.stats = self.build()
+            return self.stats
+        grid = self.grid
+        cols, rows = grid.cols, grid.rows
+        moves, offsets = grid.moves, self.offsets
+        distance, direction = self.distance, self.direction
+        block = set()
+        for index in self.pending:
+            x, y = grid.get_pos(index)
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    if 0 <= x+dx < cols and 0 <= y+dy < rows:
+                        block.add(index + dy*cols + dx)
+        self.pending.clear()
+        #Cells whose next move is gone, then every cell whose way to the goal runs through one of them
+        broken = [index for index in block if direction[index] != NONE and not moves[index]>>direction[index] & 1]
+        cleared = set(broken)
+        while broken:
+            index = broken.pop()
+            distance[index] = INF
+            direction[index] = NONE
+            for k, offset in enumerate(offsets): #Neighbors whose move leads here, steps[k] then back over k+4
+                neighbor = index - offset
+                if 0 <= neighbor < len(distance) and direction[neighbor] == k and neighbor not in cleared:
+                    cleared.add(neighbor)
+                    broken.append(neighbor)
+        #Search again from every cell that may offer a lower distance: the edited blocks and the cells around the cleared ones
+        sources = {index for index in block if distance[index] < INF}
+        for index in cleared:
+            for offset, step in grid.table[moves[index]]:
+                if distance[index + offset] < INF:
+                    sources.add(index + offset)
+        self.stats = self.search(sources)
+        return self.stats
+
+    def next(self, index): #Next cell on the way to the goal, None at the goal or without a way
+        k = self.direction[index]
+        return None if k == NONE else index + self.offsets[k]
+
+    def path(self, index): #Indices from index to the goal, [] without a way
+        if self.distance[index] == INF:
+            return []
+        result = [index]
+        while index != self.goal:
+            index += self.offsets[self.direction[index]]
+            result.append(index)
+        return result
+
+def get_field(grid, goal, queue='heap'): #The grid's field for goal, repaired or built as needed
+    field = grid.caches.get('flow') #The field for the grid's current goal
+    if field is not None and field.goal == goal:
+        field.update()
+        return field
+    if field is not None:
+        field.close()
+    field = grid.caches['flow'] = Field(grid, goal, queue)
+    return field
+
+def flow(grid, start, end, observer=None, every=1, queue='heap'): #Search method: the path comes from the field of end, the stats are of its last build or repair
+    #The field is searched whole and never animated, observer is not called
+    field = get_field(grid, end.index, queue)
+    stats = Stats()
+    path = field.path(start.index)
+    stats.stop()
+    if field.stats is not None: #Charged to the first query after a build or repair
+        stats.add(field.stats)
+        field.stats = None
+    if not path:
+        return None, [], stats
+    return field.distance[start.index], [grid.get_node_at(index) for index in reversed(path)], stats
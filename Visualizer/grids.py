@@ -0,0 +1,292 @@
+import settings
+
+#Grid model: cell states and adjacency, no pygame so searches can run headless
+
+directions = [(0, -1), (1, 0), (0, 1), (-1, 0)] #[up, right, down, left]
+steps = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)] #8-connected moves, diagonals at odd indices
+
+BLACK = (0, 0, 0)
+GREY = (128, 128, 128)
+LIGHTGREY = (192, 192, 192)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+TURQUOISE = (64, 224, 208)
+ORANGE = (255, 165, 0)
+YELLOW = (255, 255, 0)
+
+#Cell states, stored one byte per cell in Grid.cells and turned into colors only when drawn
+DEFAULT, WALL, START, END, FLAG, PATH, OPEN, CLOSED = range(8)
+COLORS = (WHITE, GREY, GREEN, RED, ORANGE, BLUE, YELLOW, TURQUOISE)
+CLEAR = bytes(DEFAULT if state in (PATH, OPEN, CLOSED) else state for state in range(256)) #Translation table for clear_other
+PACK = bytes(ord('1') if state == WALL else ord('0') for state in range(256)) #Cell state to a binary digit for get_walls
+UNPACK = bytes(WALL if byte == ord('1') else DEFAULT for byte in range(256))
+FREE = bytes(ord('0') if state == WALL else ord('1') for state in range(256)) #Cell state to a binary digit for build
+DIGIT = bytes(byte == ord('1') for byte in range(256)) #Binary digit to a byte of 0 or 1
+
+def unpack_walls(data, count): #Cell states of count cells from walls packed as Grid.get_walls packs them, data is any bytes-like object
+    digits = bytearray(bin(int.from_bytes(data, 'little'))[2:].zfill(len(data)*8), 'ascii')
+    digits.reverse()
+    return digits[:count].translate(UNPACK)
+
+class Node: #View of one cell of a grid
+    __slots__ = ('grid', 'index')
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.index == other.index and self.grid is other.grid
+
+    def __hash__(self):
+        return self.index
+
+    def __lt__(self, other):
+        return self.index < other.index
+
+    def get_pos(self):
+        return self.grid.get_pos(self.index)
+
+    def get_state(self):
+        return self.grid.cells[self.index]
+
+    def get_color(self):
+        return COLORS[self.get_state()]
+
+    def is_start(self):
+        return self.get_state() == START
+
+    def is_end(self):
+        return self.get_state() == END
+
+    def is_flag(self):
+        return self.get_state() == FLAG
+
+    def is_destination(self):
+        return START <= self.get_state() <= FLAG
+
+    def is_wall(self):
+        return self.get_state() == WALL
+
+    def is_path(self):
+        return self.get_state() == PATH
+
+    def set_state(self, state):
+        self.grid.set_state(self.index, state)
+
+    def set_default(self):
+        self.set_state(DEFAULT)
+
+    def set_start(self):
+        self.set_state(START)
+    
+    def set_end(self):
+        self.set_state(END)
+
+    def set_flag(self):
+        self.set_state(FLAG)
+
+    def set_wall(self):
+        self.set_state(WALL)
+
+    def set_path(self):
+        self.set_state(PATH)
+
+    def set_open(self):
+        self.set_state(OPEN)
+    
+    def set_closed(self):
+        self.set_state(CLOSED)
+
+    def distance(self, other):
+        return self.grid.distance(self.index, other.index)
+
+class Grid: #Cell states in one bytearray, indexed row by row (y*cols + x)
+    def __init__(self, cols=settings.ACROSS, rows=None):
+        self.cols = cols
+        self.rows = rows or cols
+        self.cells = bytearray(self.cols*self.rows)
+        self.version = 0 #Bumped on every wall change, so caches built from the walls know when to rebuild
+        self.caches = {} #What the search modules keep between queries, by module name: held by the grid so it goes with it
+        self.watchers = [] #Called with the index of every cell that becomes or stops being a wall, None if they all may have
+        #Adjacency index: bit k of moves[index] is set if steps[k] can be taken from the cell
+        #table maps a bit mask to its (index offset, cost) pairs, so neighbors are one lookup away
+        offsets = [dy*self.cols + dx for dx, dy in steps]
+        self.table = [tuple((offsets[k], 10 + 4*(k%2)) for k in range(8) if mask>>k & 1) for mask in range(256)]
+        self.moves = bytearray(b'\xff')*len(self.cells) #Every move is open inside an empty grid, only the edges need masks
+        for x in range(self.cols):
+            for y in {0, self.rows-1}:
+                self.moves[self.get_index((x, y))] = self.get_mask(self.get_index((x, y)))
+        for y in range(self.rows):
+            for x in {0, self.cols-1}:
+                self.moves[self.get_index((x, y))] = self.get_mask(self.get_index((x, y)))
+        self.open_moves = bytes(self.moves) #Adjacency of the empty grid, restored by clear_all
+        self.dirty = set() #Indices changed since the last frame, for whatever draws the grid
+        self.full = True #Everything may have changed
+        self.start = self.get_node((0, 0))
+        self.end = self.get_node((self.cols-1, self.rows-1))
+        self.start.set_start()
+        self.end.set_end()
+        self.flags = []
+
+    def get_index(self, pos):
+        x, y = pos
+        return y*self.cols + x
+
+    def get_pos(self, index):
+        y, x = divmod(index, self.cols)
+        return x, y
+
+    def get_node(self, pos):
+        return Node(self, self.get_index(pos))
+
+    def distance(self, a, b): #Octile distance between two indices
+        y1, x1 = divmod(a, self.cols)
+        y2, x2 = divmod(b, self.cols)
+        x_dist = abs(x1 - x2)
+        y_dist = abs(y1 - y2)
+        if x_dist <= y_dist:
+            return x_dist*14 + (y_dist - x_dist)*10
+        else:
+            return y_dist*14 + (x_dist - y_dist)*10
+
+    def get_node_at(self, index):
+        return Node(self, index)
+
+    def set_state(self, index, state):
+        old = self.cells[index]
+        if old != state:
+            self.cells[index] = state
+            self.dirty.add(index)
+            if old == WALL or state == WALL:
+                self.patch(index)
+                self.version += 1
+                for watcher in self.watchers:
+                    watcher(index)
+
+    def get_mask(self, index):
+        if self.cells[index] == WALL:
+            return 0
+        x, y = self.get_pos(index)
+        free = [self.valid_pos((x+dx, y+dy)) for dx, dy in steps]
+        mask = 0
+        for k in range(8):
+            if free[k] and (k%2 == 0 or free[k-1] or free[(k+1)%8]): #No cutting between two walls
+                mask |= 1<<k
+        return mask
+
+    def build(self): #Whole index at once: each move is a shifted bitset of the free cells, padded with a ring of walls
+        width = self.cols + 2
+        digits = self.cells.translate(FREE)
+        edge = b'0'*width
+        padded = edge + b''.join(b'0' + digits[y*self.cols:(y+1)*self.cols] + b'0' for y in range(self.rows)) + edge
+        free = int(padded[::-1], 2) #Bit p is padded cell p
+        shifted = [free >> offset if offset > 0 else free << -offset for offset in [dy*width + dx for dx, dy in steps]]
+        spread = 0 #Byte p of the number is the mask of padded cell p
+        for k in range(8):
+            bits = free & shifted[k]
+            if k%2: #No cutting between two walls
+                bits &= shifted[k-1] | shifted[(k+1)%8]
+            spread |= int.from_bytes(bin(bits)[2:].zfill(len(padded)).encode().translate(DIGIT), 'big') << k
+        padded = spread.to_bytes(len(padded), 'little')
+        self.moves[:] = b''.join(padded[(y+1)*width + 1:(y+1)*width + 1 + self.cols] for y in range(self.rows))
+
+    def patch(self, index): #A wall change only affects the cell and its 8 neighbors
+        x, y = self.get_pos(index)
+        self.moves[index] = self.get_mask(index)
+        for dx, dy in steps:
+            if 0 <= x+dx < self.cols and 0 <= y+dy < self.rows:
+                neighbor = self.get_index((x+dx, y+dy))
+                self.moves[neighbor] = self.get_mask(neighbor)
+
+    def get_neighbors(self, index):
+        return [(index + offset, cost) for offset, cost in self.table[self.moves[index]]]
+
+    def watch(self, watcher):
+        self.watchers.append(watcher)
+
+    def unwatch(self, watcher):
+        self.watchers.remove(watcher)
+
+    def get_start(self):
+        return self.start
+
+    def get_end(self):
+        return self.end
+
+    def get_flags(self):
+        return self.flags
+
+    def get_flags_end(self):
+        return self.flags + [self.end]
+
+    def add_flag(self, flag):
+        self.flags.append(flag)
+
+    def remove_flag(self, flag):
+        self.flags.remove(flag)
+
+    def valid_pos(self, pos):
+        x, y = pos
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            if self.cells[y*self.cols + x] != WALL:
+                return True
+        return False
+
+    def relocate(self, node, new_node): #Point the start/end/flag reference at node to new_node
+        if node == self.start:
+            self.start = new_node
+        elif node == self.end:
+            self.end = new_node
+        else:
+            self.flags[self.flags.index(node)] = new_node
+
+    def clear_all(self):
+        self.cells[:] = bytes(len(self.cells))
+        self.moves[:] = self.open_moves
+        self.version += 1
+        for watcher in self.watchers:
+            watcher(None)
+        self.start.set_start()
+        self.end.set_end()
+        self.flags.clear()
+        self.redraw()
+
+    def get_walls(self): #Walls packed 8 cells to a byte, bit i of the number is cell i
+        digits = self.cells.translate(PACK)
+        digits.reverse()
+        return int(digits, 2).to_bytes((len(self.cells) + 7)//8, 'little')
+
+    def set_walls(self, data): #Replaces the walls with get_walls output, the start, end and flags stay where they are
+        self.set_board(unpack_walls(data, len(self.cells)), self.start.index, self.end.index, [flag.index for flag in self.flags])
+
+    def set_board(self, cells, start, end, flags=()): #Bulk write of free and wall cells, with the start, end and flags put at those indices
+        cells = bytearray(cells)
+        self.start = self.get_node_at(start)
+        self.end = self.get_node_at(end)
+        self.flags = [self.get_node_at(index) for index in flags]
+        for node, state in [(self.start, START), (self.end, END)] + [(flag, FLAG) for flag in self.flags]:
+            cells[node.index] = state
+        self.set_cells(cells)
+
+    def set_cells(self, cells): #Bulk write of every cell state, the adjacency index is rebuilt once
+        self.cells[:] = cells
+        self.build()
+        self.version += 1
+        for watcher in self.watchers:
+            watcher(None)
+        self.redraw()
+
+    def clear_other(self):
+        self.cells[:] = self.cells.translate(CLEAR)
+        self.redraw()
+
+    def reset(self):
+        self.start = self.get_node((0, 0))
+        self.end = self.get_node((self.cols-1, self.rows-1))
+        self.clear_all()
+    
+    def redraw(self):
+        self.full = True
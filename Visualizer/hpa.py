@@ -0,0 +1,251 @@
+from queues import QUEUES
+from stats import Stats
+
+#Hierarchical pathfinding (HPA*): the grid is cut into CLUSTER x CLUSTER blocks
+#Each maximal run of free cell pairs across a block border is an entrance: its middle pair (both ends if it is 6 or longer) become abstract nodes
+#Abstract nodes are linked across the border (cost 10) and to every other abstract node of their block by the
+#shortest path that stays inside the block. Queries search this graph, and the cells of an edge are only worked out when refined:
+#route() refines an edge when its cells are walked to, hpa() walks them all to return a whole path like the other searches
+#Wall edits only mark blocks dirty, they are rebuilt (with the borders touching the edited cell) at the next query
+
+CLUSTER = 10
+
+class Abstraction:
+    def __init__(self, grid, size=CLUSTER):
+        self.grid = grid
+        self.size = size
+        self.across = (grid.cols + size - 1)//size
+        self.down = (grid.rows + size - 1)//size
+        self.entrances = {} #(cluster, cluster): [(cell, cell)]
+        self.inter = {} #cell: {cell across the border: 10}
+        self.nodes = {} #cluster: set of abstract cells
+        self.intra = {} #cluster: {cell: {cell: cost}}
+        self.paths = {} #(cell, cell): cells between two abstract nodes of one cluster, filled in by refine
+        self.pending = set() #Edited cells, None for everything
+        self.rebuilt = 0 #Clusters rebuilt so far
+        self.pending.add(None)
+        grid.watch(self.pending.add)
+
+    def get_cluster(self, index):
+        x, y = self.grid.get_pos(index)
+        return (y//self.size)*self.across + x//self.size
+
+    def bounds(self, cluster): #x range and y range of a cluster
+        y, x = divmod(cluster, self.across)
+        x, y = x*self.size, y*self.size
+        return range(x, min(x + self.size, self.grid.cols)), range(y, min(y + self.size, self.grid.rows))
+
+    def borders(self, cluster): #(cluster, cluster) keys of the borders around a cluster
+        y, x = divmod(cluster, self.across)
+        result = []
+        if x > 0:
+            result.append((cluster - 1, cluster))
+        if x + 1 < self.across:
+            result.append((cluster, cluster + 1))
+        if y > 0:
+            result.append((cluster - self.across, cluster))
+        if y + 1 < self.down:
+            result.append((cluster, cluster + self.across))
+        return result
+
+    def find_entrances(self, a, b): #a is left of or above b
+        grid = self.grid
+        xs, ys = self.bounds(a)
+        if b == a + self.across: #Checked first, a grid one cluster wide has b == a + 1 below too
+            pairs = [((x, ys[-1]), (x, ys[-1] + 1)) for x in xs]
+        else:
+            pairs = [((xs[-1], y), (xs[-1] + 1, y)) for y in ys]
+        for p, q in self.entrances.get((a, b), []):
+            del self.inter[p][q]
+            del self.inter[q][p]
+        result = []
+        run = []
+        for p, q in pairs + [(None, None)]:
+            if p is not None and grid.valid_pos(p) and grid.valid_pos(q):
+                run.append((grid.get_index(p), grid.get_index(q)))
+            elif run:
+                result += [run[0], run[-1]] if len(run) >= 6 else [run[len(run)//2]]
+                run = []
+        for p, q in result:
+            self.inter.setdefault(p, {})[q] = 10
+            self.inter.setdefault(q, {})[p] = 10
+        self.entrances[(a, b)] = result
+
+    def local(self, source, cluster, target=None): #Dijkstra inside one cluster, returns (cost, came_from)
+        table, moves = self.grid.table, self.grid.moves
+        open = QUEUES['heap']()
+        open.push(source, 0)
+        cost = {source: 0}
+        came_from = {}
+        done = set()
+        while open:
+            current_cost, current = open.pop()
+            done.add(current)
+            if current == target:
+                break
+            for offset, step in table[moves[current]]:
+                neighbor = current + offset
+                if neighbor in done or self.get_cluster(neighbor) != cluster:
+                    continue
+                if neighbor not in cost or current_cost + step < cost[neighbor]:
+                    cost[neighbor] = current_cost + step
+                    came_from[neighbor] = current
+                    open.push(neighbor, current_cost + step)
+        return cost, came_from
+
+    def build_cluster(self, cluster):
+        nodes = set()
+        for key in self.borders(cluster):
+            for pair in self.entrances[key]:
+                nodes.add(pair[key.index(cluster)])
+        self.nodes[cluster] = nodes
+        self.intra[cluster] = {}
+        for node in nodes:
+            cost = self.local(node, cluster)[0]
+            self.intra[cluster][node] = {other: cost[other] for other in nodes if other != node and other in cost}
+        self.paths = {key: path for key, path in self.paths.items() if self.get_cluster(key[0]) != cluster}
+        self.rebuilt += 1
+
+    def update(self):
+        if not self.pending:
+            return
+        if None in self.pending:
+            clusters = set(range(self.across*self.down))
+            borders = {key for cluster in clusters for key in self.borders(cluster)}
+        else:
+            clusters, borders = set(), set()
+            for index in self.pending:
+                cluster = self.get_cluster(index)
+                clusters.add(cluster)
+                x, y = self.grid.get_pos(index)
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)): #Borders the cell sits on
+                    if 0 <= x+dx < self.grid.cols and 0 <= y+dy < self.grid.rows:
+                        other = self.get_cluster(self.grid.get_index((x+dx, y+dy)))
+                        if other != cluster:
+                            clusters.add(other)
+                            borders.add((min(cluster, other), max(cluster, other)))
+        self.pending.clear()
+        for a, b in borders:
+            self.find_entrances(a, b)
+        for cluster in clusters:
+            self.build_cluster(cluster)
+
+    def get_edges(self, node): #Abstract neighbors of a node with their costs
+        edges = dict(self.intra[self.get_cluster(node)].get(node, {}))
+        edges.update(self.inter.get(node, {}))
+        return edges
+
+    def connect(self, index): #Temporary edges from a cell to the abstract nodes of its cluster
+        cluster = self.get_cluster(index)
+        cost = self.local(index, cluster)[0]
+        return {node: cost[node] for node in self.nodes[cluster] if node in cost and node != index}
+
+    def find(self, start, end, observer=None, every=1, queue='heap'): #Abstract route from start to end, returns (cost, route, stats)
+        self.update()
+        stats = Stats()
+        opened, closed = [], []
+        from_start = self.connect(start)
+        towards_end = self.connect(end)
+        if self.get_cluster(start) == self.get_cluster(end):
+            direct = self.local(start, self.get_cluster(start), end)[0]
+            if end in direct:
+                from_start[end] = direct[end]
+        open = QUEUES[queue]()
+        open.push(start, self.grid.distance(start, end))
+        g_cost = {start: 0}
+        came_from = {}
+        settled = set()
+        while open:
+            current = open.pop()[1]
+            if current == end:
+                stats.count(open)
+                route = [current]
+                while route[-1] in came_from:
+                    route.append(came_from[route[-1]])
+                route.reverse()
+                if observer:
+                    escape = stats.observe(observer, opened, closed)
+                    if escape:
+                        return escape
+                return g_cost[end], route, stats
+            settled.add(current)
+            stats.expanded += 1
+            edges = self.get_edges(current)
+            if current == start:
+                edges.update(from_start)
+            if current in towards_end:
+                edges[end] = towards_end[current]
+            for neighbor, cost in edges.items():
+                if neighbor in settled:
+                    continue
+                new_cost = g_cost[current] + cost
+                old_cost = g_cost.get(neighbor)
+                if old_cost is None or new_cost < old_cost:
+                    g_cost[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    open.push(neighbor, new_cost + self.grid.distance(neighbor, end))
+                    if observer and old_cost is None:
+                        opened.append(neighbor)
+            if observer:
+                closed.append(current)
+                if stats.expanded%every == 0:
+                    escape = stats.observe(observer, opened, closed)
+                    if escape:
+                        return escape
+                    opened, closed = [], []
+        stats.count(open)
+        return None, [], stats
+
+    def refine(self, route, version): #Cells along an abstract route, one edge at a time as they are needed
+        #version is the grid.version the route was found for, walls edited since may cut an edge not refined yet
+        #or one refined and cached for an earlier query, so the walk stops instead of going on through them
+        yield route[0]
+        for a, b in zip(route, route[1:]):
+            if self.grid.version != version:
+                raise RuntimeError('the walls changed after the route was found, call route() again')
+            cluster = self.get_cluster(a)
+            if cluster != self.get_cluster(b): #Border crossing
+                yield b
+                continue
+            path = self.paths.get((a, b))
+            if path is None:
+                came_from = self.local(a, cluster, b)[1]
+                path = [b]
+                while path[-1] != a:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                path = path[1:]
+                if a in self.nodes[cluster] and b in self.nodes[cluster]: #Only edges between abstract nodes stay valid after the query
+                    self.paths[(a, b)] = path
+            yield from path
+
+def get_abstraction(grid):
+    abstraction = grid.caches.get('hpa')
+    if abstraction is None:
+        abstraction = grid.caches['hpa'] = Abstraction(grid)
+    return abstraction
+
+def route(grid, start, end, observer=None, every=1, queue='heap'): #Lazy query: (cost, cells, stats), cost None if there is no path
+    #cells yields the indices from start to end, each abstract edge is only refined when the walk gets to it,
+    #so an agent that replans after a few steps never pays for the rest. stats cover the abstract search only
+    #A wall edit before the walk is over makes the next step raise RuntimeError, the route has to be found again
+    abstraction = get_abstraction(grid)
+    result = abstraction.find(start.index, end.index, observer, every, queue)
+    if type(result) is int:
+        return result
+    cost, path, stats = result
+    if not path:
+        return None, iter(()), stats
+    return cost, abstraction.refine(path, grid.version), stats
+
+def hpa(grid, start, end, observer=None, every=1, queue='heap'): #Search method: the whole path refined at once, as the others return it
+    result = route(grid, start, end, observer, every, queue)
+    if type(result) is int:
+        return result
+    cost, cells, stats = result
+    if cost is None:
+        return None, [], stats
+    path = [grid.get_node_at(index) for index in cells]
+    path.reverse()
+    stats.stop() #Refining is part of the search
+    return cost, path, stats
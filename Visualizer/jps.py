@@ -0,0 +1,194 @@
+from queues import QUEUES
+from stats import Stats
+from grids import WALL
+
+#Jump Point Search for the 8-connected grid, where a diagonal move only needs one of its two sides free
+#Straight jumps are read from JPS+ style tables: for each cell and straight direction the distance to the next
+#jump point (> 0) or minus the number of free cells before a wall (<= 0). They watch the grid, and a wall edit only
+#rebuilds the rows and columns through the cells around it
+
+straight = [(0, -1), (1, 0), (0, 1), (-1, 0)] #[up, right, down, left]
+
+def free(grid, x, y):
+    return grid.valid_pos((x, y))
+
+def forced(grid, x, y, dx, dy): #A straight move into (x, y) has a forced neighbor there
+    if dx:
+        return (free(grid, x+dx, y+1) and not free(grid, x, y+1)) or (free(grid, x+dx, y-1) and not free(grid, x, y-1))
+    return (free(grid, x+1, y+dy) and not free(grid, x+1, y)) or (free(grid, x-1, y+dy) and not free(grid, x-1, y))
+
+class Tables: #The jump tables of a grid, one per straight direction, kept up to date with its walls
+    def __init__(self, grid):
+        self.grid = grid
+        self.jumps = [[0]*len(grid.cells) for d in straight]
+        self.pending = {None} #Edited cells, None for everything
+        grid.watch(self.pending.add)
+
+    def get_line(self, horizontal, line): #Free cells of a row or column, with a wall at each end: item i + 1 is cell i
+        grid = self.grid
+        if not (0 <= line < (grid.rows if horizontal else grid.cols)):
+            return [False]*((grid.cols if horizontal else grid.rows) + 2)
+        cells = grid.cells[line*grid.cols:(line+1)*grid.cols] if horizontal else grid.cells[line::grid.cols]
+        return [False] + [state != WALL for state in cells] + [False]
+
+    def build_line(self, d, line): #Table d along one row (left and right) or column (up and down)
+        #The same as free() and forced() cell by cell, but reading the line and the two beside it once
+        grid = self.grid
+        dx, dy = straight[d]
+        forward = dx or dy
+        step = 1 if dx else grid.cols #Index step along the line
+        first = line*grid.cols if dx else line
+        own, left, right = self.get_line(bool(dx), line), self.get_line(bool(dx), line-1), self.get_line(bool(dx), line+1)
+        table = self.jumps[d]
+        length = len(own) - 2
+        for i in (range(length-1, -1, -1) if forward > 0 else range(length)): #The next cell in the direction is always done first
+            n = i + forward + 1 #Next cell, as an item of the lines
+            index = first + i*step
+            if not own[n]:
+                table[index] = 0
+            elif (left[n+forward] and not left[n]) or (right[n+forward] and not right[n]):
+                table[index] = 1
+            else:
+                ahead = table[index + forward*step]
+                table[index] = ahead + 1 if ahead > 0 else ahead - 1
+
+    def update(self): #A wall edit only changes the rows and columns through its 3x3 block
+        grid = self.grid
+        if not self.pending:
+            return
+        if None in self.pending:
+            rows, columns = range(grid.rows), range(grid.cols)
+        else:
+            rows, columns = set(), set()
+            for index in self.pending:
+                x, y = grid.get_pos(index)
+                rows.update(row for row in (y-1, y, y+1) if 0 <= row < grid.rows)
+                columns.update(column for column in (x-1, x, x+1) if 0 <= column < grid.cols)
+        self.pending.clear()
+        for d, (dx, dy) in enumerate(straight):
+            for line in (rows if dx else columns):
+                self.build_line(d, line)
+
+def get_tables(grid):
+    tables = grid.caches.get('jps')
+    if tables is None:
+        tables = grid.caches['jps'] = Tables(grid)
+    tables.update()
+    return tables.jumps
+
+def jump_straight(grid, jumps, index, d, end): #Next jump point from index along straight[d], or None
+    dx, dy = straight[d]
+    x, y = grid.get_pos(index)
+    ex, ey = grid.get_pos(end)
+    distance = jumps[d][index]
+    reach = distance if distance > 0 else -distance
+    if (dx and ey == y and 0 < (ex - x)*dx <= reach) or (dy and ex == x and 0 < (ey - y)*dy <= reach):
+        return end
+    if distance > 0:
+        return grid.get_index((x + dx*distance, y + dy*distance))
+    return None
+
+def jump_diagonal(grid, jumps, index, dx, dy, end):
+    x, y = grid.get_pos(index)
+    horizontal = straight.index((dx, 0))
+    vertical = straight.index((0, dy))
+    while True:
+        if not (free(grid, x+dx, y+dy) and (free(grid, x+dx, y) or free(grid, x, y+dy))):
+            return None
+        x, y = x+dx, y+dy
+        index = grid.get_index((x, y))
+        if index == end:
+            return index
+        if (free(grid, x-dx, y+dy) and not free(grid, x-dx, y)) or (free(grid, x+dx, y-dy) and not free(grid, x, y-dy)):
+            return index
+        if jump_straight(grid, jumps, index, horizontal, end) is not None or jump_straight(grid, jumps, index, vertical, end) is not None:
+            return index
+
+def directions(grid, index, parent): #Pruned neighbor directions of index when reached from parent
+    x, y = grid.get_pos(index)
+    if parent is None:
+        return [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    px, py = grid.get_pos(parent)
+    dx = (x > px) - (x < px)
+    dy = (y > py) - (y < py)
+    result = []
+    if dx and dy:
+        result += [(0, dy), (dx, 0), (dx, dy)]
+        if not free(grid, x-dx, y) and free(grid, x, y+dy):
+            result.append((-dx, dy))
+        if not free(grid, x, y-dy) and free(grid, x+dx, y):
+            result.append((dx, -dy))
+    elif dx:
+        result.append((dx, 0))
+        if free(grid, x+dx, y):
+            if not free(grid, x, y+1):
+                result.append((dx, 1))
+            if not free(grid, x, y-1):
+                result.append((dx, -1))
+    else:
+        result.append((0, dy))
+        if free(grid, x, y+dy):
+            if not free(grid, x+1, y):
+                result.append((1, dy))
+            if not free(grid, x-1, y):
+                result.append((-1, dy))
+    return result
+
+def fill(grid, came_from, current): #Path through every cell between the jump points, from current back to the start
+    result = [current]
+    while current in came_from:
+        parent = came_from[current]
+        x, y = grid.get_pos(current)
+        px, py = grid.get_pos(parent)
+        dx = (px > x) - (px < x)
+        dy = (py > y) - (py < y)
+        while (x, y) != (px, py):
+            x, y = x+dx, y+dy
+            result.append(grid.get_index((x, y)))
+        current = parent
+    return [grid.get_node_at(index) for index in result]
+
+def jps(grid, start, end, observer=None, every=1, queue='heap'):
+    start, end = start.index, end.index
+    jumps = get_tables(grid)
+    stats = Stats()
+    opened, closed = [], []
+    open = QUEUES[queue]()
+    open.push(start, 0)
+    came_from = {}
+    g_cost = {start: 0}
+    while open:
+        current = open.pop()[1]
+        if current == end:
+            stats.count(open)
+            if observer:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+            return g_cost[current], fill(grid, came_from, current), stats
+        stats.expanded += 1
+        current_cost = g_cost[current]
+        for dx, dy in directions(grid, current, came_from.get(current)):
+            if dx and dy:
+                neighbor = jump_diagonal(grid, jumps, current, dx, dy, end)
+            else:
+                neighbor = jump_straight(grid, jumps, current, straight.index((dx, dy)), end)
+            if neighbor is None:
+                continue
+            new_g_cost = current_cost + grid.distance(current, neighbor)
+            old_g_cost = g_cost.get(neighbor)
+            if old_g_cost is None or new_g_cost < old_g_cost:
+                g_cost[neighbor] = new_g_cost
+                came_from[neighbor] = current
+                open.push(neighbor, new_g_cost + grid.distance(neighbor, end))
+                if observer and old_g_cost is None:
+                    opened.append(neighbor)
+        if observer:
+            closed.append(current)
+            if stats.expanded%every == 0:
+                escape = stats.observe(observer, opened, closed)
+                if escape:
+                    return escape
+                opened, closed = [], []
+    stats.count(open)
+    return None, [], stats
@@ -0,0 +1,138 @@
+from queues import HeapQueue
+from stats import Stats
+
+#Lifelong Planning A* (LPA*): one planner per source cell keeps its g and rhs costs between searches
+#g is the cost the planner settled on, rhs the cost one step from a neighbor's g; a cell is consistent when they match
+#A wall edit only makes the 3x3 block around it inconsistent (no move outside the block crosses or ends on the cell),
+#so the next search repairs from there instead of starting over. A new goal only re-keys the open list
+#Keys are (f, g) tuples, so the open list is always a HeapQueue, whatever the queue argument says
+
+INF = float('inf')
+PLANNERS = 16 #Planners kept per grid, the oldest is dropped beyond this
+
+class Planner:
+    def __init__(self, grid, source):
+        self.grid = grid
+        self.source = source
+        self.goal = source
+        self.pending = set() #Edited cells, None for everything
+        self.opened = None #Cells pushed since the observer was last called, while there is one
+        grid.watch(self.pending.add)
+        self.reset()
+
+    def reset(self):
+        self.g = {}
+        self.rhs = {self.source: 0}
+        self.open = HeapQueue()
+        self.open.push(self.source, self.key(self.source))
+        self.pending.clear()
+
+    def close(self):
+        self.grid.unwatch(self.pending.add)
+
+    def key(self, index):
+        cost = min(self.g.get(index, INF), self.rhs.get(index, INF))
+        return cost + self.grid.distance(index, self.goal), cost
+
+    def update(self, index): #Recompute rhs from the neighbors and put the cell in the open list if it is inconsistent
+        if index != self.source:
+            get = self.g.get
+            best = INF
+            for offset, cost in self.grid.table[self.grid.moves[index]]:
+                cost += get(index + offset, INF)
+                if cost < best:
+                    best = cost
+            self.rhs[index] = best
+        self.queue(index)
+
+    def queue(self, index):
+        if self.g.get(index, INF) != self.rhs.get(index, INF):
+            self.open.push(index, self.key(index))
+            if self.opened is not None:
+                self.opened.append(index)
+        else:
+            self.open.remove(index)
+
+    def apply(self): #Make the cells around every wall edit consistent again
+        if None in self.pending:
+            self.reset()
+            return
+        grid = self.grid
+        for index in self.pending:
+            x, y = grid.get_pos(index)
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    if 0 <= x+dx < grid.cols and 0 <= y+dy < grid.rows:
+                        self.update(grid.get_index((x+dx, y+dy)))
+        self.pending.clear()
+
+    def find(self, goal, observer=None, every=1): #Returns (cost, path from goal back to source, stats) or the escape code
+        stats = Stats()
+        self.opened, closed = ([], []) if observer else (None, None)
+        self.apply()
+        if goal != self.goal: #The heuristic changed, so every key did
+            self.goal = goal
+            items, self.open = self.open.items(), HeapQueue()
+            for item in items:
+                self.open.push(item, self.key(item))
+        open, g, rhs = self.open, self.g, self.rhs
+        table, moves = self.grid.table, self.grid.moves
+        open.pushes = open.pops = open.stale = 0
+        open.peak = len(open)
+        while open and (open.peek()[0] < self.key(goal) or rhs.get(goal, INF) != g.get(goal, INF)):
+            current = open.pop()[1]
+            stats.expanded += 1
+            old = g.get(current, INF)
+            new = rhs.get(current, INF)
+            if old > new: #Overconsistent: settle it and offer the lower cost to the neighbors
+                g[current] = new
+                for offset, cost in table[moves[current]]:
+                    neighbor = current + offset
+                    if neighbor != self.source and new + cost < rhs.get(neighbor, INF):
+                        rhs[neighbor] = new + cost
+                        self.queue(neighbor)
+            else: #Underconsistent: its cost went up, neighbors that relied on it look for another way
+                g[current] = INF
+                self.update(current)
+                for offset, cost in table[moves[current]]:
+                    neighbor = current + offset
+                    if neighbor != self.source and rhs.get(neighbor, INF) == old + cost:
+                        self.update(neighbor)
+            if observer:
+                closed.append(current)
+                if stats.expanded%every == 0:
+                    escape = stats.observe(observer, self.opened, closed)
+                    if escape:
+                        return escape
+                    self.opened, closed = [], []
+        stats.count(open)
+        if observer:
+            escape = stats.observe(observer, self.opened, closed)
+            if escape:
+                return escape
+        if g.get(goal, INF) == INF:
+            return None, [], stats
+        path = [goal]
+        while path[-1] != self.source: #Walk down the g costs
+            current = path[-1]
+            path.append(min(self.grid.get_neighbors(current), key=lambda step: g.get(step[0], INF) + step[1])[0])
+        return g[goal], path, stats
+
+def get_planner(grid, source):
+    table = grid.caches.get('lpa') #{source index: Planner}
+    if table is None:
+        table = grid.caches['lpa'] = {}
+    planner = table.pop(source, None)
+    if planner is None:
+        planner = Planner(grid, source)
+    table[source] = planner #Most recently used last
+    if len(table) > PLANNERS:
+        table.pop(next(iter(table))).close()
+    return planner
+
+def lpa(grid, start, end, observer=None, every=1, queue='heap'):
+    result = get_planner(grid, start.index).find(end.index, observer, every)
+    if type(result) is int:
+        return result
+    cost, path, stats = result
+    return cost, [grid.get_node_at(index) for index in path], stats
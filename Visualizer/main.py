@@ -1,72 +1,145 @@
+import sys
 import pygame
 import settings
 import objects as obj
 import algorithms as algo
+import mazes
+import maps
+import worker
+import flow
+from grids import DEFAULT
 
 WIDTH = settings.WIDTH
-ACROSS = settings.ACROSS
-SIZE = settings.SIZE
 SIDE_BAR = settings.SIDE_BAR
-WIN = settings.WIN
-font = settings.font
-pygame.display.set_caption("Pathfinding Visualizer")
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
+PAN = {pygame.K_UP: (0, -1), pygame.K_RIGHT: (1, 0), pygame.K_DOWN: (0, 1), pygame.K_LEFT: (-1, 0)} #Arrow keys scroll the viewport
 
 def main():
+    settings.init()
+    WIN = settings.WIN
+    font = settings.font
     WIN.fill(WHITE)
-    grid = obj.Grid()
-    labels = ('Algorithm', 'Flags', 'Maze Gen.')
-    for i in range(len(labels)):
-        text = font.render(labels[i] , True , BLACK)
-        text_rect = text.get_rect(center=(WIDTH+SIDE_BAR//2, 2*i*SIDE_BAR + SIDE_BAR//4))
+    args = sys.argv[1:] #python main.py [columns] [rows] [fps] or python main.py board [fps]
+    if args and not args[0].isdigit(): #Board file or MovingAI map
+        board = args.pop(0)
+        grid = maps.read(board, obj.Board)
+        board = board.rsplit('.', 1)[0] + maps.EXTENSION #Saved in the binary format next to it
+    else:
+        board = settings.BOARD
+        grid = obj.Board(*[int(arg) for arg in args[:2]])
+        args = args[2:]
+    fps = int(args[0]) if args else settings.FPS
+    grid.frames.set_fps(fps)
+    ROW = SIDE_BAR//4 #Sidebar row height
+    labels = (('Algorithm', 0), ('Flags', 8), ('Maze Gen.', 12), ('Last Run', 19)) #(text, row)
+    for label, row in labels:
+        text = font.render(label , True , BLACK)
+        text_rect = text.get_rect(center=(WIDTH+SIDE_BAR//2, row*ROW + ROW//2))
         WIN.blit(text, text_rect)
-        pygame.draw.line(WIN, BLACK, (WIDTH, (4*(i+1)-3)*SIDE_BAR//2 - 2), (WIDTH+SIDE_BAR, (4*(i+1)-3)*SIDE_BAR//2 - 2), 2)
+        pygame.draw.line(WIN, BLACK, (WIDTH, (row+1)*ROW - 2), (WIDTH+SIDE_BAR, (row+1)*ROW - 2), 2)
+    panel = obj.Panel(WIDTH+1, 20*ROW, SIDE_BAR, WIDTH - 20*ROW) #Stats of the last run
+    place = lambda row: (WIDTH+1, row*ROW, SIDE_BAR, ROW)
+    job = None #Search or maze generator running in the background, the grid is not edited while there is one
+    name = None #Of the search the job runs, None for a maze generator
+    shown = None #(field, version) of the flow field overlay last shown in the panel
+    def start(function, *args): #Runs function(*args, job) as the job unless one is running
+        nonlocal job
+        if job is None:
+            grid.frames.draw_time = 0
+            job = worker.Job(function, *args)
+        return False
+    generate = lambda generator, *args: lambda: start(algo.generate, grid, generator, args)
+    ALGORITHMS = (0, 1, 2, 9, 11, 15) #Indices of the mutually exclusive algorithm buttons
+    pick = lambda index: lambda: [buttons[i].deselect() for i in ALGORITHMS if i != index]
     buttons = [
-        obj.Button3(WIDTH+1, SIDE_BAR//2, SIDE_BAR, SIDE_BAR//2, 'A*', lambda: buttons[1].deselect()),
-        obj.Button3(WIDTH+1, SIDE_BAR, SIDE_BAR, SIDE_BAR//2, 'Dijkstra', lambda: buttons[0].deselect()),
-        obj.Button(WIDTH+1, 5*SIDE_BAR//2, SIDE_BAR, SIDE_BAR//2, 'Add Flag'),
-        obj.Button(WIDTH+1, 3*SIDE_BAR, SIDE_BAR, SIDE_BAR//2, 'Shortest Path'),
-        obj.Button2(WIDTH+1, 9*SIDE_BAR//2, SIDE_BAR, SIDE_BAR//2, 'Maze', lambda: algo.maze((ACROSS//2, ACROSS//2), grid)),
-        obj.Button2(WIDTH+1, 5*SIDE_BAR, SIDE_BAR, SIDE_BAR//2, 'Recursive', lambda: algo.grow_tree(grid, True)),
-        obj.Button2(WIDTH+1, 11*SIDE_BAR//2, SIDE_BAR, SIDE_BAR//2, 'Prim\'s', lambda: algo.grow_tree(grid, False))
+        obj.Button3(*place(1), 'A*', pick(0)),
+        obj.Button3(*place(2), 'Dijkstra', pick(1)),
+        obj.Button3(*place(3), 'JPS', pick(2)),
+        obj.Button(*place(9), 'Add Flag'),
+        obj.Button(*place(10), 'Shortest Path'),
+        obj.Button2(*place(13), 'Maze', generate(mazes.maze)),
+        obj.Button2(*place(14), 'Recursive', generate(mazes.grow_tree, True)),
+        obj.Button2(*place(15), 'Prim\'s', generate(mazes.grow_tree, False)),
+        obj.Button(*place(7), 'Bidirectional'),
+        obj.Button3(*place(4), 'HPA*', pick(9)),
+        obj.Button(*place(11), 'Parallel'),
+        obj.Button3(*place(5), 'LPA*', pick(11)),
+        obj.Button2(*place(16), 'Kruskal\'s', generate(mazes.kruskal)),
+        obj.Button2(*place(17), 'Wilson\'s', generate(mazes.wilson)),
+        obj.Button2(*place(18), 'Eller\'s', generate(mazes.eller)),
+        obj.Button3(*place(6), 'ALT', pick(15))
     ]
     buttons[0].select()
     make_wall = False
+    drag = None #(node, state of the cell under it) while a start, end or flag is dragged
     running = True
     while running:
+        done = job and grid.frames.play(job) #Done and every step of it shown
+        if grid.overlay and not job: #Keeps the flow field on the current end and walls
+            grid.overlay = flow.get_field(grid, grid.get_end().index)
+            if shown != (grid.overlay, grid.overlay.version):
+                shown = (grid.overlay, grid.overlay.version)
+                panel.show(['Flow field'] + (grid.overlay.stats.get_lines() if grid.overlay.stats else []))
         grid.draw()
+        if done:
+            if job.error:
+                raise job.error
+            if name:
+                distance, total = job.result
+                total.draw_time = grid.frames.draw_time #Measured here, the job only saw how long it waited for the window
+                panel.show([name, 'stopped' if job.is_cancelled() else 'no path' if distance is None else 'cost %d' % distance] + total.get_lines())
+            job = name = None
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             pos = pygame.mouse.get_pos()
-            x, y = tuple(elem//(SIZE) for elem in pos)
-            if event.type == pygame.MOUSEBUTTONUP:
+            cell = grid.view.to_cell(pos)
+            if event.type == pygame.MOUSEWHEEL: #Zoom around the mouse
+                grid.view.zoom(event.y, pos if cell else None)
+                grid.redraw()
+            if event.type == pygame.MOUSEBUTTONUP and event.button < 4: #4 and 5 are the wheel
                 if WIDTH <= pos[0]:
                     for button in buttons:
                         if button.get_rect().collidepoint(pos):
-                            if buttons.index(button) == 3:
+                            if buttons.index(button) == 4:
                                 if len(grid.get_flags()) < 2:
                                     continue
-                            running = bool(button.click()-1)
+                            button.click()
                 make_wall = False
+                drag = None
+            if event.type == pygame.KEYDOWN: #The view, the speed and stopping work during a run too
+                if event.key == pygame.K_BACKSPACE and job:
+                    job.cancel()
+                elif event.key in obj.SPEED:
+                    grid.frames.set_speed(grid.frames.speed*obj.SPEED[event.key])
+                elif event.key in PAN:
+                    dx, dy = PAN[event.key]
+                    step = max(1, grid.view.span()//8)
+                    grid.view.pan(dx*step, dy*step)
+                    grid.redraw()
+            if job: #The grid is in use
+                continue
             if pygame.mouse.get_pressed()[0]:
-                if pos[0] < WIDTH:
-                    current = grid.get_node((x, y))
-                    if current.is_destination():
-                        if not (make_wall or buttons[2].is_selected()):
-                            grid.move_node(current)
-                    elif buttons[2].is_selected():
+                if cell:
+                    current = grid.get_node(cell)
+                    if drag:
+                        if current != drag[0] and not current.is_destination():
+                            drag = grid.move_node(drag[0], current, drag[1])
+                    elif current.is_destination():
+                        if not (make_wall or buttons[3].is_selected()):
+                            drag = (current, DEFAULT)
+                    elif buttons[3].is_selected():
                         current.set_flag()
                         grid.add_flag(current)
-                        buttons[2].deselect()
+                        buttons[3].deselect()
                     else:
                         make_wall = True
                         current.set_wall()
             elif pygame.mouse.get_pressed()[2]:
-                if pos[0] < WIDTH:
-                    current = grid.get_node((x, y))
+                if cell:
+                    current = grid.get_node(cell)
                     if not (current.is_start() or current.is_end()):
                         if current.is_flag():
                             grid.remove_flag(current)
@@ -74,72 +147,54 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     grid.clear_other()
-                    if buttons[0].is_selected():
-                        search = lambda: algo.astar(grid, prev, next)
+                    if buttons[4].is_selected():
+                        name = 'Flags, ' + ('Dijkstra' if buttons[1].is_selected() else 'A*')
+                        start(algo.visit_flags, grid, not buttons[1].is_selected(), buttons[10].is_selected())
                     else:
-                        search = lambda: algo.dijkstra(grid, prev, next)
-                    if buttons[3].is_selected():
-                        prev = grid.get_start()
-                        costs = {}
-                        came_from = {}
-                        path_exists = True
-                        for next in grid.get_flags():
-                            temp = search()
-                            try:
-                                costs[(prev, next)], came_from[(prev, next)] = temp
-                            except: #Path not found or function exited
-                                running = bool(temp-1)
-                                path_exists = False
-                                break
-                        if path_exists:
-                            flags = grid.get_flags_end()
-                            for i in range(len(flags)):
-                                prev = flags[i]
-                                for j in range(i+1, len(flags)):
-                                    next = flags[j]
-                                    temp = search()
-                                    try:
-                                        costs[(prev, next)], came_from[(prev, next)] = temp
-                                    except: #Path not found or function exited
-                                        running = bool(temp-1)
-                                        path_exists = False
-                                        break
-                        if path_exists:
-                            path, distance = algo.shortest_path(costs, len(grid.get_flags()), set(), grid.get_start(), grid.get_end(), [], 0)
-                            connect = grid.get_start()
-                            for key in path:
-                                if came_from[key][0] != connect:
-                                    came_from[key] = reversed(came_from[key])
-                                for node in came_from[key]:
-                                    if not node.is_destination():
-                                        node.set_path()
-                                        grid.draw()
-                                else:
-                                    connect = node
-                    else:
-                        prev = grid.get_start()
-                        for next in grid.get_flags_end():
-                            temp = search()
-                            try:
-                                came_from = temp[1]
-                                for node in reversed(came_from):
-                                    if not node.is_destination():
-                                        node.set_path()
-                                        grid.draw()
-                            except: #Path not found or function exited
-                                running = bool(temp-1)
-                                break
-                            prev = next
+                        if buttons[0].is_selected():
+                            method, name = ('bi-astar', 'Bi-A*') if buttons[8].is_selected() else ('astar', 'A*')
+                        elif buttons[1].is_selected():
+                            method, name = ('bi-dijkstra', 'Bi-Dijkstra') if buttons[8].is_selected() else ('dijkstra', 'Dijkstra')
+                        elif buttons[2].is_selected():
+                            method, name = 'jps', 'JPS'
+                        elif buttons[15].is_selected():
+                            method, name = 'alt', 'ALT'
+                        elif buttons[9].is_selected():
+                            method, name = 'hpa', 'HPA*'
+                        else: #Keeps its search between runs and only repairs what the edits changed
+                            method, name = 'lpa', 'LPA*'
+                        start(algo.search, grid, method)
                 elif event.key == pygame.K_c:
                     grid.clear_all()
+                elif event.key == pygame.K_f: #Flow field overlay on or off
+                    grid.overlay = None if grid.overlay else flow.get_field(grid, grid.get_end().index)
+                    shown = None
+                    grid.redraw()
+                elif event.key == pygame.K_s:
+                    maps.save(grid, board)
+                    panel.show(['saved', board])
+                elif event.key == pygame.K_l:
+                    try:
+                        loaded = maps.read(board, obj.Board)
+                    except (OSError, ValueError):
+                        panel.show(['cannot load', board])
+                    else:
+                        loaded.frames.set_fps(fps)
+                        loaded.frames.set_speed(grid.frames.speed)
+                        grid = loaded
+                        panel.show(['loaded', board])
         if not (bool(grid.get_flags())):
-            buttons[3].deselect()
+            buttons[4].deselect()
         pos = pygame.mouse.get_pos()
         for button in buttons:
             button.clear()
             if button.get_rect().collidepoint(pos):
                 button.hovered()
-            button.draw()
+            button.refresh()
+        grid.frames.wait() #Nothing to do until the next frame
+    if job: #Stops at its next step, the thread does not keep the process alive
+        job.cancel()
     pygame.quit()
 
-main()
+if __name__ == '__main__':
+    main()
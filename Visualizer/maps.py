@@ -0,0 +1,72 @@
+import mmap
+import struct
+from grids import Grid, unpack_walls, DEFAULT, WALL
+
+#Boards on disk, no pygame: save/load a small binary format and import MovingAI benchmark maps (.map)
+#Binary format: header of magic, format version, columns, rows, start index, end index and flag count,
+#one uint32 index per flag, then the walls packed 8 cells to a byte as Grid.get_walls packs them (bit i is cell i)
+#Files are read through mmap, the walls go from the mapped file straight into the grid's cell bytes
+#make is the class of the grid to load into, objects.Board for the visualizer
+
+MAGIC = b'PFGRID'
+VERSION = 1
+HEADER = struct.Struct('<6sH5I')
+EXTENSION = '.grid'
+TERRAIN = bytes(DEFAULT if chr(byte) in '.GS' else WALL for byte in range(256)) #MovingAI: ground and swamp are passable, trees, water and out of bounds are not
+
+def save(grid, path):
+    flags = [flag.index for flag in grid.get_flags()]
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, grid.cols, grid.rows, grid.get_start().index, grid.get_end().index, len(flags)))
+        file.write(struct.pack('<%dI' % len(flags), *flags))
+        file.write(grid.get_walls())
+
+def load(path, make=Grid):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < HEADER.size:
+            raise ValueError('%s is not a board file' % path)
+        magic, version, cols, rows, start, end, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('%s is not a board file' % path)
+        if version != VERSION:
+            raise ValueError('%s has format version %d, only %d is supported' % (path, version, VERSION))
+        offset = HEADER.size + 4*count
+        size = (cols*rows + 7)//8
+        if len(data) < offset + size:
+            raise ValueError('%s is truncated' % path)
+        flags = struct.unpack_from('<%dI' % count, data, HEADER.size)
+        with memoryview(data) as view:
+            cells = unpack_walls(view[offset:offset + size], cols*rows)
+    grid = make(cols, rows)
+    grid.set_board(cells, start, end, flags)
+    return grid
+
+def import_map(path, make=Grid): #MovingAI map, the start and end go on the first and last passable cells
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header = {}
+        position = 0
+        while True: #type, height and width lines up to the "map" line
+            stop = data.find(b'\n', position)
+            if stop < 0:
+                raise ValueError('%s has no map section' % path)
+            line = data[position:stop].split()
+            position = stop + 1
+            if line == [b'map']:
+                break
+            if len(line) == 2:
+                header[line[0].decode()] = line[1].decode()
+        cols, rows = int(header['width']), int(header['height'])
+        body = data[position:].translate(None, b'\r\n')
+    if len(body) < cols*rows:
+        raise ValueError('%s has fewer cells than %d x %d' % (path, cols, rows))
+    cells = body[:cols*rows].translate(TERRAIN)
+    start = cells.find(DEFAULT)
+    end = cells.rfind(DEFAULT)
+    if start == end:
+        raise ValueError('%s has fewer than two passable cells' % path)
+    grid = make(cols, rows)
+    grid.set_board(cells, start, end)
+    return grid
+
+def read(path, make=Grid): #By extension: MovingAI .map or the binary format
+    return (import_map if path.lower().endswith('.map') else load)(path, make)
@@ -0,0 +1,223 @@
+import random
+from itertools import permutations
+from grids import DEFAULT, WALL, START, END, FLAG
+
+#Maze generators, headless and seeded: the same seed on the same grid gives the same maze
+#Each generator works out the cells it changes on its own copy of the grid and then writes them with apply:
+#in one bulk write (Grid.set_cells) without an observer, or as a stream of (index, state) events, `every` at a time,
+#to observer(events), which writes them (this is how the visualizer animates them). A truthy return from the observer
+#stops the generator and is returned
+
+directions = [(0, -1), (1, 0), (0, 1), (-1, 0)] #[up, right, down, left]
+BLOCKED = bytes(state == WALL for state in range(256))
+KEEP = bytes(state in (START, END, FLAG) for state in range(256)) #Cells a generator never walls over
+FILL = bytes(255 if byte else 0 for byte in range(256)) #0 or 1 to a byte mask
+
+def padded(grid, table, edge, pad=1): #Cell states through table, in a grid with pad rings of edge around it
+    width = grid.cols + 2*pad
+    ring = bytes([edge])*pad
+    rows = [ring + grid.cells[y*grid.cols:(y+1)*grid.cols].translate(table) + ring for y in range(grid.rows)]
+    return bytearray(ring*width + b''.join(rows) + ring*width)
+
+def apply(grid, base, state, order, observer=None, every=1): #base: every cell state before, order: cells set to state, in order
+    if observer is None:
+        cells = bytearray(base)
+        for index in order:
+            cells[index] = state
+        grid.set_cells(cells)
+        return False
+    if base != grid.cells:
+        grid.set_cells(base)
+    for i in range(0, len(order), every):
+        escape = observer([(index, state) for index in order[i:i+every]])
+        if escape:
+            return escape
+    return False
+
+def maze(grid, pos=None, seed=None, observer=None, every=1): #Grows walls from pos, a wall only goes where the 3x2 cells ahead of it are free
+    rng = random.Random(seed)
+    cols, rows = grid.cols, grid.rows
+    width = cols + 4
+    x, y = pos if pos else (cols//2, rows//2)
+    if not (0 <= x < cols and 0 <= y < rows):
+        return False
+    blocked = padded(grid, BLOCKED, 1, 2) #Walls and the outside, two cells deep for the look-ahead
+    keep = padded(grid, KEEP, 0, 2)
+    #For each order the directions are tried in: offsets of the cell ahead, its two sides, the cell beyond and its two sides
+    orders = [tuple((step, step - side, step + side, 2*step - side, 2*step, 2*step + side) for step, side in moves)
+              for moves in permutations([(dy*width + dx, abs(dy) + abs(dx)*width) for dx, dy in directions])]
+    pick = rng.random
+    order = []
+    current = (y+2)*width + x+2
+    tries = iter(orders[int(pick()*24)])
+    stack = [] #(wall, directions left), like the call stack of a recursive version
+    while True:
+        for a, b, c, d, e, f in tries:
+            if blocked[current+e] or blocked[current+a] or blocked[current+b] or blocked[current+c] or blocked[current+d] or blocked[current+f]:
+                continue
+            if keep[current+a]:
+                continue
+            stack.append((current, tries))
+            current += a
+            blocked[current] = 1
+            if observer:
+                order.append(current)
+            tries = iter(orders[int(pick()*24)])
+            break
+        else:
+            if not stack:
+                break
+            current, tries = stack.pop()
+    if observer is None: #Every cell blocked now is a wall, in one go
+        walls = b''.join(blocked[(y+2)*width + 2:(y+2)*width + 2 + cols] for y in range(rows)).translate(FILL)
+        mask = int.from_bytes(walls, 'little')
+        cells = (int.from_bytes(grid.cells, 'little') & ~mask) | (int.from_bytes(bytes([WALL])*len(walls), 'little') & mask)
+        grid.set_cells(cells.to_bytes(len(walls), 'little'))
+        return False
+    order = [(index//width - 2)*cols + index%width - 2 for index in order]
+    return apply(grid, bytes(grid.cells), WALL, order, observer, every)
+
+def tree_base(grid): #Resets the grid and walls off the cells at even (x, y) from each other, the tree generators carve between them
+    grid.reset()
+    cols = grid.cols
+    even = (bytes([DEFAULT, WALL])*cols)[:cols]
+    odd = bytes([WALL])*cols
+    base = bytearray(b''.join(odd if y%2 else even for y in range(grid.rows)))
+    base[grid.get_start().index] = START
+    base[grid.get_end().index] = END
+    x, y = grid.get_end().get_pos()
+    if x%2 and y%2: #On an even sized grid the end is off the tree, link it through the dead end wall above it
+        base[grid.get_index((x, y-1))] = DEFAULT
+    return base
+
+def tree_neighbors(cols, rows, index): #Cells of the tree two steps away
+    y, x = divmod(index, cols)
+    result = []
+    if y >= 2:
+        result.append(index - 2*cols)
+    if x + 2 < cols:
+        result.append(index + 2)
+    if y + 2 < rows:
+        result.append(index + 2*cols)
+    if x >= 2:
+        result.append(index - 2)
+    return result
+
+def grow_tree(grid, mode, seed=None, observer=None, every=1): #Generate maze by removing walls, mode picks the newest cell (recursive backtracker) or a random one (Prim's)
+    pick = random.Random(seed).random
+    cols, rows = grid.cols, grid.rows
+    base = tree_base(grid)
+    order = []
+    visited = bytearray(len(base))
+    visited[0] = 1
+    check = [0] #Cells that may still have unvisited neighbors, removed by swapping in the last one
+    while check:
+        i = len(check) - 1 if mode else int(pick()*len(check))
+        current = check[i]
+        left = [neighbor for neighbor in tree_neighbors(cols, rows, current) if not visited[neighbor]]
+        if len(left) <= 1: #Done with current once its last neighbor is taken
+            last = check.pop()
+            if i < len(check):
+                check[i] = last
+        if left:
+            neighbor = left[int(pick()*len(left))]
+            visited[neighbor] = 1
+            check.append(neighbor)
+            order.append((current + neighbor)//2)
+    return apply(grid, base, DEFAULT, order, observer, every)
+
+def kruskal(grid, seed=None, observer=None, every=1): #Walls between cells knocked down in random order whenever they join two trees
+    rng = random.Random(seed)
+    cols, rows = grid.cols, grid.rows
+    base = tree_base(grid)
+    order = []
+    edges = [(index, index + 2) for y in range(0, rows, 2) for index in range(y*cols, y*cols + cols - 2, 2)]
+    edges += [(index, index + 2*cols) for y in range(0, rows - 2, 2) for index in range(y*cols, y*cols + cols, 2)]
+    rng.shuffle(edges)
+    parent = list(range(len(base))) #Union-find over the cells, with path halving and union by size
+    size = [1]*len(base)
+    for a, b in edges:
+        roots = []
+        for root in (a, b):
+            while parent[root] != root:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            roots.append(root)
+        small, large = sorted(roots, key=size.__getitem__)
+        if small != large:
+            parent[small] = large
+            size[large] += size[small]
+            order.append((a + b)//2)
+    return apply(grid, base, DEFAULT, order, observer, every)
+
+def wilson(grid, seed=None, observer=None, every=1): #Loop-erased random walks from each cell until they reach the tree, every maze is equally likely
+    rng = random.Random(seed)
+    pick = rng.random
+    cols, rows = grid.cols, grid.rows
+    base = tree_base(grid)
+    order = []
+    cells = [y*cols + x for y in range(0, rows, 2) for x in range(0, cols, 2)]
+    rng.shuffle(cells)
+    in_tree = bytearray(len(base))
+    in_tree[cells[0]] = 1
+    heading = [0]*len(base) #Where the walk last left each cell, so retracing it skips the loops
+    for start in cells:
+        current = start
+        while not in_tree[current]:
+            options = tree_neighbors(cols, rows, current)
+            heading[current] = current = options[int(pick()*len(options))]
+        current = start
+        while not in_tree[current]:
+            in_tree[current] = 1
+            order.append((current + heading[current])//2)
+            current = heading[current]
+    return apply(grid, base, DEFAULT, order, observer, every)
+
+def eller_rows(width, height, rng): #Eller's algorithm, one row of cells at a time: only the current row's sets are kept
+    #Yields (joins, drops) per row: x in joins links cell x to x+1, x in drops links cell x to the cell below
+    pick = rng.random
+    label = list(range(width))
+    fresh = width #Next unused set label
+    for y in range(height):
+        last = y == height - 1
+        members = {}
+        for x in range(width):
+            members.setdefault(label[x], []).append(x)
+        joins = []
+        for x in range(width - 1):
+            a, b = label[x], label[x+1]
+            if a != b and (last or pick() < 0.5):
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for member in members[b]: #Smaller set into the larger one
+                    label[member] = a
+                members[a] += members.pop(b)
+                joins.append(x)
+        if last:
+            yield joins, []
+            return
+        drops = []
+        for group in members.values(): #At least one way down from every set
+            down = group[int(pick()*len(group))]
+            for x in group:
+                if x == down or pick() < 0.3:
+                    drops.append(x)
+        below = [None]*width
+        for x in drops:
+            below[x] = label[x]
+        for x in range(width):
+            if below[x] is None:
+                below[x] = fresh
+                fresh += 1
+        label = below
+        yield joins, sorted(drops)
+
+def eller(grid, seed=None, observer=None, every=1):
+    cols, rows = grid.cols, grid.rows
+    base = tree_base(grid)
+    order = []
+    for y, (joins, drops) in enumerate(eller_rows((cols + 1)//2, (rows + 1)//2, random.Random(seed))):
+        row = 2*y*cols
+        order += [row + 2*x + 1 for x in joins]
+        order += [row + cols + 2*x for x in drops]
+    return apply(grid, base, DEFAULT, order, observer, every)
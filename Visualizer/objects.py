@@ -1,204 +1,174 @@
 import pygame
 import settings
+from time import perf_counter
+from collections import deque
+import flow
+from grids import Grid, steps, COLORS, BLACK, GREY, LIGHTGREY, WHITE, DEFAULT, OPEN, CLOSED, PATH
+from viewport import Viewport
 
 WIDTH = settings.WIDTH
-ACROSS = settings.ACROSS
-SIZE = settings.SIZE
-WIN = settings.WIN
-font = settings.font
-
-directions = [(0, -1), (1, 0), (0, 1), (-1, 0)] #[up, right, down, left]
-
-BLACK = (0, 0, 0)
-GREY = (128, 128, 128)
-LIGHTGREY = (192, 192, 192)
-WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-TURQUOISE = (64, 224, 208)
-ORANGE = (255, 165, 0)
-YELLOW = (255, 255, 0)
-
-class Node:
-    def __init__(self, pos):
-        self.x_pos, self.y_pos = pos
-        self.color = WHITE
-        self.neighbors = []
-
-    def get_pos(self):
-        return self.x_pos, self.y_pos
-
-    def change_pos(self, new_pos):
-        self.x_pos, self.y_pos = new_pos
-
-    def get_neighbors(self):
-        return self.neighbors.copy()
-
-    def is_start(self):
-        return self.color == GREEN
-
-    def is_end(self):
-        return self.color == RED
-
-    def is_flag(self):
-        return self.color == ORANGE
-
-    def is_destination(self):
-        return self.is_start() or self.is_end() or self.is_flag()
-
-    def is_wall(self):
-        return self.color == GREY
-
-    def is_path(self):
-        return self.color == BLUE
-
-    def set_default(self):
-        self.color = WHITE
-
-    def set_start(self):
-        self.color = GREEN
-    
-    def set_end(self):
-        self.color = RED
-
-    def set_flag(self):
-        self.color = ORANGE
-
-    def set_wall(self):
-        self.color = GREY
-
-    def set_path(self):
-        self.color = BLUE
-
-    def set_open(self):
-        self.color = YELLOW
-    
-    def set_closed(self):
-        self.color = TURQUOISE
-
-    def distance(self, other):
-        x, y = other.get_pos()
-        x_dist = abs(self.x_pos - x)
-        y_dist = abs(self.y_pos - y)
-        if x_dist <= y_dist:
-            return x_dist*14 + (y_dist - x_dist)*10
+AREA = pygame.Rect(0, 0, WIDTH, WIDTH) #Part of the window the grid is drawn in
+SPEED = {pygame.K_EQUALS: 2, pygame.K_KP_PLUS: 2, pygame.K_MINUS: 0.5, pygame.K_KP_MINUS: 0.5} #Keys that change the animation speed
+OVERLAY = (OPEN, CLOSED, PATH) #Search states, only drawn over cells that are free or hold another search state
+FREE = (DEFAULT, OPEN, CLOSED)
+TRANSPARENT = (255, 0, 255) #Color key of the grid lines and overlay surfaces, never a cell color
+SHADES = [TRANSPARENT] + [(255 - i//2, 64 + i//2, i) for i in range(255)] #Flow field overlay, near the goal to far from it
+
+class Frames: #Plays the (index, state) events of a worker.Job on a board: at most speed*STEPS of them per frame, fps frames per second
+    #An index of None is a whole board, state is then (cells, start, end, flags) for Grid.set_board
+    def __init__(self, board, fps=settings.FPS):
+        self.board = board
+        self.fps = fps
+        self.speed = 1
+        self.pending = deque() #Events taken from the job but not shown yet
+        self.draw_time = 0 #Seconds spent applying and drawing events since the window last reset it
+        self.clock = pygame.time.Clock()
+
+    def get_budget(self): #Events per frame
+        return max(1, int(settings.STEPS*self.speed))
+
+    def set_speed(self, speed):
+        self.speed = min(256, max(1/8, speed))
+        pygame.display.set_caption('%s  x%g at %d fps' % (settings.CAPTION, self.speed, self.fps))
+
+    def set_fps(self, fps):
+        self.fps = fps
+        self.set_speed(self.speed)
+
+    def play(self, job): #Applies one frame's worth of the job's events, returns True once the job is done and all of them are shown
+        begin = perf_counter()
+        finished = job.is_finished() #Before taking any batch, so none can come after the last one taken
+        if job.is_cancelled(): #Nothing more of it is shown
+            while job.get() is not None:
+                pass
+            self.pending.clear()
+            return finished
+        budget = self.get_budget()
+        while len(self.pending) < budget:
+            batch = job.get()
+            if batch is None:
+                break
+            self.pending.extend(batch)
+        board = self.board
+        cells = board.cells
+        pop = self.pending.popleft
+        for i in range(min(budget, len(self.pending))):
+            index, state = pop()
+            if index is None:
+                board.set_board(*state)
+            elif state not in OVERLAY or cells[index] in FREE:
+                board.set_state(index, state)
+        self.draw_time += perf_counter() - begin
+        return finished and not self.pending and job.is_empty()
+
+    def wait(self): #Sleeps out the rest of the frame
+        self.clock.tick(self.fps)
+
+class Board(Grid): #Grid drawn in the window, settings.init() must have been called
+    def __init__(self, cols=settings.ACROSS, rows=None):
+        super(Board, self).__init__(cols, rows)
+        self.view = Viewport(self.cols, self.rows, WIDTH, WIDTH//max(self.cols, self.rows), settings.MIN_SIZE)
+        self.frames = Frames(self)
+        self.lines = None #(cell size, right, bottom) and the grid lines surface drawn for them
+        self.overlay = None #flow.Field drawn over the cells
+        self.shade = None #(field, its version, viewport) and the overlay surface drawn for them
+
+    def draw_cell(self, index): #Cell and its top/left grid lines, the bottom/right ones belong to the neighbors
+        view = self.view
+        rect = pygame.Rect(view.to_pixel(self.get_pos(index)), (view.size, view.size)).clip(AREA)
+        pygame.draw.rect(settings.WIN, COLORS[self.cells[index]], rect)
+        if view.size >= settings.LINES:
+            pygame.draw.line(settings.WIN, BLACK, rect.topleft, rect.topright)
+            pygame.draw.line(settings.WIN, BLACK, rect.topleft, rect.bottomleft)
+        return rect
+
+    def move_node(self, node, new_node, under): #Drags a start, end or flag onto new_node, under is the state of the cell it covers
+        #Returns the moved node and the state it now covers
+        state = node.get_state()
+        node.set_state(under)
+        under = new_node.get_state()
+        new_node.set_state(state)
+        self.relocate(node, new_node)
+        return new_node, under
+
+    def render(self): #Every visible cell in one blit: the cell states are the palette indices of an image one pixel per cell, scaled up
+        view = self.view
+        xs, ys = view.visible()
+        cols = self.cols
+        if len(xs) == cols: #Whole rows, one slice
+            data = bytes(self.cells[ys.start*cols:ys.stop*cols])
         else:
-            return y_dist*14 + (x_dist - y_dist)*10
-
-    def update_neighbors(self, grid):
-        self.neighbors.clear()
-        x, y = self.get_pos()
-        for index in range(len(directions)):
-            x1, y1 = directions[index]
-            x2, y2 = directions[(index+1)%4]
-            if grid.valid_pos((x+x1, y+y1)):
-                self.neighbors.append(grid.get_node((x+x1, y+y1)))
-            if grid.valid_pos((x+x1+x2, y+y1+y2)) and (grid.valid_pos((x+x1, y+y1)) or grid.valid_pos((x+x2, y+y2))):
-                self.neighbors.append(grid.get_node((x+x1+x2, y+y1+y2)))
-
-    def draw(self):
-        pygame.draw.rect(WIN, self.color, (self.x_pos*SIZE, self.y_pos*SIZE, SIZE, SIZE))
-
-class Grid:
-    def __init__(self):
-        self.grid = []
-        for i in range(ACROSS):
-            self.grid.append([])
-            for j in range(ACROSS):
-                self.grid[i].append(Node((i, j)))
-        self.start = self.grid[0][0]
-        self.end = self.grid[ACROSS-1][ACROSS-1]
-        self.start.set_start()
-        self.end.set_end()
-        self.flags = []
-        self.old = Node((0, 0))
-
-    def get_node(self, pos):
-        x, y = pos
-        return self.grid[x][y]
-
-    def get_start(self):
-        return self.start
-
-    def get_end(self):
-        return self.end
-
-    def get_flags(self):
-        return self.flags
-
-    def get_flags_end(self):
-        return self.flags + [self.end]
-
-    def add_flag(self, flag):
-        self.flags.append(flag)
-
-    def remove_flag(self, flag):
-        self.flags.remove(flag)
-
-    def valid_pos(self, pos):
-        x, y = pos
-        if 0 <= x < ACROSS and 0 <= y < ACROSS:
-            if not self.get_node(pos).is_wall():
-                return True
-        return False
-
-    def move_node(self, node):
-        x, y = pos = node.get_pos()
-        self.old.change_pos(pos)
-        run = True
-        while run:
-            for event in pygame.event.get():
-                if not pygame.mouse.get_pressed()[0]:
-                    run = False
-                mouse = tuple(elem//(SIZE) for elem in pygame.mouse.get_pos())
-                if mouse != pos:
-                    if mouse[0] < ACROSS:
-                        if not self.get_node(mouse).is_destination():
-                            self.grid[x][y] = self.old
-                            self.old = self.get_node(mouse)
-                            x, y = pos = mouse
-                            self.grid[x][y] = node
-                            node.change_pos(mouse)
-                            self.draw()
-        self.old.set_default()
-
-    def clear_all(self):
-        for col in self.grid:
-            for node in col:
-                node.set_default()
-        self.start.set_start()
-        self.end.set_end()
-        self.flags.clear()
-
-    def clear_other(self):
-        for col in self.grid:
-            for node in col:
-                if not (node.is_destination() or node.is_wall()):
-                    node.set_default()
-
-    def reset(self):
-        self.start.set_default()
-        self.start = self.grid[0][0]
-        self.end.set_default()
-        self.end = self.grid[ACROSS-1][ACROSS-1]
-        self.clear_all()
-    
-    def draw(self):
-        for col in self.grid:
-            for node in col:
-                node.draw()
-        for indent in range(0, WIDTH+1, SIZE):
-            pygame.draw.line(WIN, BLACK, (0, indent), (WIDTH, indent))
-            pygame.draw.line(WIN, BLACK, (indent, 0), (indent, WIDTH))
-        pygame.display.update()
+            data = b''.join(self.cells[y*cols + xs.start:y*cols + xs.stop] for y in ys)
+        image = pygame.image.frombuffer(data, (len(xs), len(ys)), 'P')
+        image.set_palette(COLORS)
+        width, height = len(xs)*view.size, len(ys)*view.size
+        settings.WIN.fill(WHITE, AREA)
+        settings.WIN.blit(pygame.transform.scale(image, (width, height)), (0, 0), AREA)
+        if self.overlay:
+            settings.WIN.blit(self.get_shade(xs, ys), (0, 0), AREA)
+        if view.size >= settings.LINES:
+            settings.WIN.blit(self.get_lines(min(WIDTH, width), min(WIDTH, height)), (0, 0))
+
+    def get_shade(self, xs, ys): #Overlay of the flow field: distance to its goal as a color and, when cells are big enough, the move out of each cell
+        view = self.view
+        field = self.overlay
+        key = (field, field.version, view.x, view.y, view.size)
+        if self.shade is None or self.shade[0] != key:
+            distance, direction = field.distance, field.direction
+            far = max([distance[y*self.cols + x] for y in ys for x in xs if distance[y*self.cols + x] != flow.INF] or [1]) or 1
+            shades = bytes(0 if distance[y*self.cols + x] == flow.INF else 1 + distance[y*self.cols + x]*254//far for y in ys for x in xs)
+            image = pygame.image.frombuffer(shades, (len(xs), len(ys)), 'P')
+            image.set_palette(SHADES)
+            size = view.size
+            surface = pygame.transform.scale(image, (len(xs)*size, len(ys)*size)).convert()
+            if size >= settings.ARROWS:
+                for y in ys:
+                    for x in xs:
+                        k = direction[y*self.cols + x]
+                        if k != flow.NONE:
+                            cx, cy = (x - view.x)*size + size//2, (y - view.y)*size + size//2
+                            dx, dy = steps[k]
+                            pygame.draw.line(surface, BLACK, (cx, cy), (cx + dx*size*2//5, cy + dy*size*2//5), max(1, size//8))
+            surface.set_colorkey(TRANSPARENT)
+            surface.set_alpha(settings.SHADE)
+            self.shade = key, surface
+        return self.shade[1]
+
+    def get_lines(self, right, bottom): #Grid lines on a transparent surface, drawn again only when the cell size or the area changes
+        key = (self.view.size, right, bottom)
+        if self.lines is None or self.lines[0] != key:
+            surface = pygame.Surface((right+1, bottom+1))
+            surface.fill(TRANSPARENT)
+            surface.set_colorkey(TRANSPARENT)
+            for x in range(0, right+1, self.view.size):
+                pygame.draw.line(surface, BLACK, (x, 0), (x, bottom))
+            for y in range(0, bottom+1, self.view.size):
+                pygame.draw.line(surface, BLACK, (0, y), (right, y))
+            self.lines = key, surface
+        return self.lines[1]
+
+    def draw(self): #Only repaints and flips the cells changed since the last frame
+        begin = perf_counter()
+        view = self.view
+        if self.full or (self.overlay and self.dirty): #Every cell in the viewport, the overlay is only drawn whole
+            self.render()
+            pygame.display.update()
+            self.full = False
+        elif len(self.dirty) > settings.BLIT: #Cheaper as one blit than cell by cell
+            self.render()
+            pygame.display.update(AREA)
+        elif self.dirty:
+            pygame.display.update([self.draw_cell(index) for index in self.dirty if view.is_visible(self.get_pos(index))])
+        self.dirty.clear()
+        self.frames.draw_time += perf_counter() - begin
 
 class Button: #Toggle button
     def __init__(self, x_pos, y_pos, width, height, text):
         self.color = WHITE
         self.rect = pygame.Rect(x_pos, y_pos, width, height)
-        self.text = font.render(text, True, BLACK)
+        self.text = settings.font.render(text, True, BLACK)
         self.text_rect = self.text.get_rect(center=(x_pos + width//2, y_pos + height//2))
+        self.shown = None #Color currently on screen
 
     def get_rect(self):
         return self.rect
@@ -228,8 +198,14 @@ class Button: #Toggle button
             self.color = WHITE
 
     def draw(self):
-        pygame.draw.rect(WIN, self.color, self.rect)
-        WIN.blit(self.text, self.text_rect)
+        pygame.draw.rect(settings.WIN, self.color, self.rect)
+        settings.WIN.blit(self.text, self.text_rect)
+        pygame.display.update(self.rect)
+        self.shown = self.color
+
+    def refresh(self): #Draw only if the color changed since it was last drawn
+        if self.color != self.shown:
+            self.draw()
 
 class Button2(Button): #Execute button
     def __init__(self, x_pos, y_pos, width, height, text, function):
@@ -248,3 +224,18 @@ class Button3(Button2): #Relational button
         self.draw()
         self.execute()
         return False
+
+class Panel: #Lines of text in the sidebar
+    def __init__(self, x_pos, y_pos, width, height):
+        self.rect = pygame.Rect(x_pos, y_pos, width, height)
+        self.shown = None #Lines currently on screen
+
+    def show(self, lines):
+        if lines == self.shown:
+            return
+        pygame.draw.rect(settings.WIN, WHITE, self.rect)
+        height = min(settings.font.get_linesize(), self.rect.height//max(1, len(lines))) #Squeezed to fit
+        for i, line in enumerate(lines):
+            settings.WIN.blit(settings.font.render(line, True, BLACK), (self.rect.x + 4, self.rect.y + i*height))
+        pygame.display.update(self.rect)
+        self.shown = lines
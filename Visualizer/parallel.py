@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import grids
+import engine
+
+#Runs the sweeps of the shortest path mode in worker processes
+#Each job sends the walls packed 8 cells to a byte (Grid.get_walls), a worker rebuilds the grid only when the walls change
+#Paths travel as cell indices and are turned back into nodes of the caller's grid
+
+pool = None
+board = None #(cols, rows, walls) and the grid built from them, per worker process
+
+def get_pool():
+    global pool
+    if pool is None:
+        pool = ProcessPoolExecutor(os.cpu_count())
+    return pool
+
+def get_board(cols, rows, walls):
+    global board
+    if board is None or board[0] != (cols, rows, walls):
+        grid = grids.Grid(cols, rows)
+        grid.set_cells(grids.unpack_walls(walls, cols*rows)) #Nothing stamped on the corners, the sweeps only take indices
+        board = (cols, rows, walls), grid
+    return board[1]
+
+def sweep(cols, rows, walls, start, targets, heuristic, queue): #Worker side, returns (start, {target: (cost, path)}, stats)
+    grid = get_board(cols, rows, walls)
+    found, stats = engine.search_many(grid, grid.get_node_at(start), [grid.get_node_at(target) for target in targets], queue=queue, heuristic=heuristic)
+    return start, {target.index: (cost, [node.index for node in path]) for target, (cost, path) in found.items()}, stats
+
+def search_pairs(grid, jobs, heuristic=True, queue='heap', observer=None, poll=0.05):
+    #jobs: [(source, targets)], one sweep each. Returns [(source, {target: (cost, path)}, stats)] in the order they finished
+    #observer(source, found) is called as each sweep comes back and every poll seconds with (None, None) while waiting,
+    #a truthy return cancels the sweeps not started yet and is returned as the escape code
+    walls = grid.get_walls()
+    nodes = {}
+    futures = set()
+    for source, targets in jobs:
+        nodes[source.index] = source
+        for target in targets:
+            nodes[target.index] = target
+        futures.add(get_pool().submit(sweep, grid.cols, grid.rows, walls, source.index, [target.index for target in targets], heuristic, queue))
+    results = []
+    while futures:
+        done, futures = wait(futures, poll, FIRST_COMPLETED)
+        escape = 0
+        for future in done:
+            start, found, stats = future.result()
+            found = {nodes[target]: (cost, [grid.get_node_at(index) for index in path]) for target, (cost, path) in found.items()}
+            results.append((nodes[start], found, stats))
+            if observer:
+                escape = observer(nodes[start], found) or escape
+        if observer and not done:
+            escape = observer(None, None)
+        if escape:
+            for future in futures:
+                future.cancel()
+            return escape
+    return results
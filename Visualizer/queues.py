@@ -0,0 +1,202 @@
+from heapq import heappush, heappop
+from collections import deque
+
+#Open lists for the searches, all with the same interface:
+#push(item, priority) inserts an item or lowers its priority, pop() returns (priority, item) of the lowest one and peek() returns it
+#without taking it out
+#len(), `in` and items() only count live items; equal priorities come out first in, first out
+#pushes/pops/stale count the queue operations for the search stats, peak is the most live items held at once
+
+class HeapQueue: #Binary heap with lazy deletion, outdated entries are skipped when popped
+    def __init__(self):
+        self.heap = []
+        self.best = {}
+        self.count = 0
+        self.pushes = self.pops = self.stale = self.peak = 0
+
+    def __len__(self):
+        return len(self.best)
+
+    def __contains__(self, item):
+        return item in self.best
+
+    def items(self):
+        return list(self.best)
+
+    def push(self, item, priority):
+        self.best[item] = priority
+        if len(self.best) > self.peak:
+            self.peak = len(self.best)
+        self.count += 1
+        self.pushes += 1
+        heappush(self.heap, (priority, self.count, item))
+
+    def pop(self):
+        while True:
+            priority, count, item = heappop(self.heap)
+            self.pops += 1
+            if self.best.get(item) == priority:
+                del self.best[item]
+                return priority, item
+            self.stale += 1
+
+    def peek(self): #(priority, item) of the lowest one, left in the queue
+        while True:
+            priority, count, item = self.heap[0]
+            if self.best.get(item) == priority:
+                return priority, item
+            heappop(self.heap)
+            self.pops += 1
+            self.stale += 1
+
+    def remove(self, item): #Its entries are skipped from now on
+        self.best.pop(item, None)
+
+class BucketQueue: #Dial's algorithm: a ring of FIFO buckets, one per integer priority
+    def __init__(self, span=64): #span must exceed the priority range in the queue, it doubles if not
+        self.span = span
+        self.buckets = [deque() for i in range(span)]
+        self.best = {}
+        self.cursor = None #Lowest priority that can still be in the queue
+        self.top = None #Highest priority pushed
+        self.pushes = self.pops = self.stale = self.peak = 0
+
+    def __len__(self):
+        return len(self.best)
+
+    def __contains__(self, item):
+        return item in self.best
+
+    def items(self):
+        return list(self.best)
+
+    def grow(self):
+        entries = [entry for bucket in self.buckets for entry in bucket]
+        entries.sort(key=lambda entry: entry[0])
+        self.span *= 2
+        self.buckets = [deque() for i in range(self.span)]
+        for entry in entries:
+            self.buckets[entry[0]%self.span].append(entry)
+
+    def push(self, item, priority):
+        self.best[item] = priority
+        if len(self.best) > self.peak:
+            self.peak = len(self.best)
+        self.pushes += 1
+        if self.cursor is None or priority < self.cursor:
+            self.cursor = priority
+        if self.top is None or priority > self.top:
+            self.top = priority
+        while self.top - self.cursor >= self.span:
+            self.grow()
+        self.buckets[priority%self.span].append((priority, item))
+
+    def pop(self):
+        while True:
+            bucket = self.buckets[self.cursor%self.span]
+            while bucket:
+                priority, item = bucket.popleft()
+                self.pops += 1
+                if self.best.get(item) == priority:
+                    del self.best[item]
+                    return priority, item
+                self.stale += 1
+            self.cursor += 1
+
+    def peek(self): #(priority, item) of the lowest one, left in the queue
+        while True:
+            bucket = self.buckets[self.cursor%self.span]
+            while bucket:
+                priority, item = bucket[0]
+                if self.best.get(item) == priority:
+                    return priority, item
+                bucket.popleft()
+                self.pops += 1
+                self.stale += 1
+            self.cursor += 1
+
+class PairNode:
+    __slots__ = ('key', 'item', 'child', 'next', 'prev')
+
+    def __init__(self, key, item):
+        self.key = key
+        self.item = item
+        self.child = self.next = self.prev = None
+
+def meld(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b.key < a.key:
+        a, b = b, a
+    b.prev = a
+    b.next = a.child
+    if a.child is not None:
+        a.child.prev = b
+    a.child = b
+    return a
+
+class PairingHeap: #Pairing heap with a real decrease-key, so it never holds outdated entries
+    def __init__(self):
+        self.root = None
+        self.nodes = {}
+        self.count = 0
+        self.pushes = self.pops = self.stale = self.peak = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, item):
+        return item in self.nodes
+
+    def items(self):
+        return list(self.nodes)
+
+    def push(self, item, priority):
+        self.count += 1
+        self.pushes += 1
+        node = self.nodes.get(item)
+        if node is None:
+            node = self.nodes[item] = PairNode((priority, self.count), item)
+            self.root = meld(self.root, node)
+            if len(self.nodes) > self.peak:
+                self.peak = len(self.nodes)
+        elif priority < node.key[0]: #Decrease-key: cut the subtree and meld it back with the root
+            node.key = (priority, self.count)
+            if node is not self.root:
+                if node.prev.child is node:
+                    node.prev.child = node.next
+                else:
+                    node.prev.next = node.next
+                if node.next is not None:
+                    node.next.prev = node.prev
+                node.next = node.prev = None
+                self.root = meld(self.root, node)
+
+    def pop(self):
+        root = self.root
+        self.pops += 1
+        del self.nodes[root.item]
+        pairs = []
+        child = root.child
+        while child is not None: #Two pass pairing: meld children in pairs, then from right to left
+            a, child = child, child.next
+            a.next = a.prev = None
+            b = None
+            if child is not None:
+                b, child = child, child.next
+                b.next = b.prev = None
+            pairs.append(meld(a, b))
+        heap = None
+        for node in reversed(pairs):
+            heap = meld(node, heap)
+        if heap is not None:
+            heap.prev = None
+        self.root = heap
+        return root.key[0], root.item
+
+    def peek(self): #(priority, item) of the lowest one, left in the queue
+        return self.root.key[0], self.root.item
+
+QUEUES = {'heap': HeapQueue, 'bucket': BucketQueue, 'pairing': PairingHeap}
@@ -0,0 +1,125 @@
+import os
+import sys
+import csv
+import json
+import math
+import time
+import argparse
+import engine
+import maps
+from queues import QUEUES
+
+#Batch runner for MovingAI scenario files: python scen.py arena.map.scen [-a astar] [-o results.csv]
+#Each line of a .scen is: bucket, map, width, height, start x, start y, goal x, goal y, optimal length
+#Every query is searched headlessly and written out (CSV, or JSONL for a .jsonl output) as soon as it is done,
+#then the throughput and p50/p99 latency go to stderr
+#--check compares the length of each path, straight steps 1 and diagonal steps sqrt(2), with the optimal length.
+#MovingAI forbids cutting any wall corner while this grid only forbids squeezing between two walls,
+#so a path may come out shorter than the optimum there: those are counted apart, only longer paths fail the check
+
+FIELDS = ('id', 'bucket', 'map', 'start', 'goal', 'optimal', 'cost', 'length', 'expanded', 'pushes', 'ms')
+
+def read_scen(path): #[(bucket, map, width, height, start, goal, optimal)], start and goal as (x, y)
+    queries = []
+    with open(path) as file:
+        for line in file:
+            parts = line.split('\t') if '\t' in line else line.split()
+            if len(parts) < 9 or parts[0] == 'version':
+                continue
+            bucket, name, width, height, x1, y1, x2, y2 = parts[:8]
+            queries.append((int(bucket), name, int(width), int(height), (int(x1), int(y1)), (int(x2), int(y2)), float(parts[8])))
+    return queries
+
+def find_map(name, scen, override): #The map named in the scenario, next to the .scen file or in a maps directory beside it
+    if override:
+        return override
+    folder = os.path.dirname(os.path.abspath(scen))
+    for path in (os.path.join(folder, name), os.path.join(folder, os.path.basename(name)),
+                 os.path.join(folder, '..', 'maps', os.path.basename(name)), os.path.join(folder, 'maps', os.path.basename(name))):
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError('map %s of %s not found, pass it with --map' % (name, scen))
+
+def length(path): #Straight steps count 1, diagonal steps sqrt(2)
+    straight = diagonal = 0
+    for a, b in zip(path, path[1:]):
+        (x1, y1), (x2, y2) = a.get_pos(), b.get_pos()
+        if x1 != x2 and y1 != y2:
+            diagonal += 1
+        else:
+            straight += 1
+    return straight + diagonal*math.sqrt(2)
+
+def percentile(ordered, fraction): #Nearest rank
+    return ordered[min(len(ordered) - 1, int(fraction*len(ordered)))] if ordered else 0
+
+def run(queries, scen, override, method, queue, write, check, tolerance): #Returns the summary lines and whether the check passed
+    boards = {} #Map path: grid, scenario files rarely use more than one map
+    latencies = []
+    shorter = longer = unreachable = 0
+    begin = time.perf_counter()
+    for i, (bucket, name, width, height, start, goal, optimal) in enumerate(queries):
+        path = find_map(name, scen, override)
+        grid = boards.get(path)
+        if grid is None:
+            grid = boards[path] = maps.read(path)
+            if (grid.cols, grid.rows) != (width, height):
+                raise ValueError('%s is %d x %d, the scenario says %d x %d' % (path, grid.cols, grid.rows, width, height))
+        tick = time.perf_counter()
+        cost, nodes, stats = engine.solve(grid, grid.get_node(start), grid.get_node(goal), method, queue)
+        ms = (time.perf_counter() - tick)*1000
+        latencies.append(ms)
+        walked = round(length(nodes), 4) if nodes else None
+        if cost is None:
+            unreachable += 1
+        elif walked < optimal - tolerance:
+            shorter += 1
+        elif walked > optimal + tolerance:
+            longer += 1
+        write({'id': i, 'bucket': bucket, 'map': name, 'start': '%d %d' % start, 'goal': '%d %d' % goal, 'optimal': optimal,
+               'cost': cost, 'length': walked, 'expanded': stats.expanded, 'pushes': stats.pushes, 'ms': round(ms, 3)})
+    elapsed = time.perf_counter() - begin
+    latencies.sort()
+    lines = ['%d queries in %.2f s, %.1f queries/s' % (len(queries), elapsed, len(queries)/elapsed if elapsed else 0),
+             'latency p50 %.3f ms, p99 %.3f ms, max %.3f ms' % (percentile(latencies, 0.5), percentile(latencies, 0.99), latencies[-1] if latencies else 0)]
+    passed = True
+    if check:
+        lines.append('check: %d longer than optimal, %d shorter (corner cutting), %d unreachable' % (longer, shorter, unreachable))
+        passed = not (longer or unreachable)
+    return lines, passed
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the queries of a MovingAI scenario file')
+    parser.add_argument('scen', help='.scen file')
+    parser.add_argument('-m', '--map', help='map to use instead of the one named in the scenario (.map or a saved board)')
+    parser.add_argument('-a', '--algorithm', default='astar', choices=sorted(engine.METHODS))
+    parser.add_argument('-q', '--queue', default='heap', choices=sorted(QUEUES))
+    parser.add_argument('-o', '--output', help='CSV, or JSONL if it ends in .jsonl, standard output by default')
+    parser.add_argument('-n', '--limit', type=int, help='only the first queries')
+    parser.add_argument('-c', '--check', action='store_true', help='compare path lengths with the optimal ones, exit status 1 on a longer or missing path')
+    parser.add_argument('-t', '--tolerance', type=float, default=1e-3)
+    args = parser.parse_args()
+    queries = read_scen(args.scen)[:args.limit]
+    file = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.output and args.output.endswith('.jsonl'):
+            def write(row):
+                file.write(json.dumps(row) + '\n')
+                file.flush()
+        else:
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            def write(row):
+                writer.writerow(row)
+                file.flush()
+        lines, passed = run(queries, args.scen, args.map, args.algorithm, args.queue, write, args.check, args.tolerance)
+    finally:
+        if args.output:
+            file.close()
+    for line in lines:
+        print(line, file=sys.stderr)
+    if not passed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
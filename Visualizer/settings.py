@@ -1,9 +1,22 @@
-import pygame
-
-pygame.init()
 WIDTH = 612
-ACROSS = 51
-SIZE = WIDTH//ACROSS
+ACROSS = 51 #Default grid side, main.py takes the columns and rows on the command line
+MIN_SIZE = 3 #Smallest cell side in pixels when zoomed out
+LINES = 4 #Grid lines are only drawn for cells at least this big
+ARROWS = 12 #The flow field overlay shows the move out of each cell for cells at least this big
+SHADE = 140 #Opacity of the flow field overlay, out of 255
+BLIT = 256 #Changed cells above which the whole grid is drawn in one blit instead of cell by cell
 SIDE_BAR = 100
-WIN = pygame.display.set_mode((WIDTH+SIDE_BAR, WIDTH))
-font = pygame.font.SysFont('Corbel', 15)
+FPS = 60 #Frames per second of animations and of the idle loop, main.py takes it after the grid size
+BOARD = 'board.grid' #Where the s key saves the board and the l key loads it from
+STEPS = 8 #Cells an animation changes per frame at speed 1
+CAPTION = "Pathfinding Visualizer"
+WIN = None #Window and font, made by init() when the visualizer starts
+font = None
+
+def init(): #Importing settings has no side effects, only the visualizer opens a window
+    global WIN, font
+    import pygame
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH+SIDE_BAR, WIDTH))
+    pygame.display.set_caption(CAPTION)
+    font = pygame.font.SysFont('Corbel', 15)
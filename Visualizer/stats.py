@@ -0,0 +1,47 @@
+from time import perf_counter
+
+#Counters a search fills in and returns with its result
+#search_time is the time spent searching, observer_time the time spent in the observer, which is left out of it
+#(drawing for an observer that draws, waiting for room in the queue for worker.Job.emit). draw_time is the time the
+#window took to show the run, it fills it in itself. All in seconds
+
+class Stats:
+    def __init__(self):
+        self.expanded = 0
+        self.pushes = self.pops = self.stale = 0
+        self.max_open = 0 #Most items the open list held at once
+        self.search_time = self.observer_time = self.draw_time = 0
+        self.octile = 0 #Expanded by plain octile A* on the same queries, when a run is compared with it
+        self.begin = perf_counter()
+
+    def observe(self, observer, opened, closed): #Call the observer, timing it apart from the search
+        begin = perf_counter()
+        escape = observer(opened, closed)
+        self.observer_time += perf_counter() - begin
+        return escape
+
+    def stop(self): #Search time so far, without the drawing
+        self.search_time = perf_counter() - self.begin - self.observer_time
+
+    def count(self, open): #Adds the counters of an open list, searches call it when they are done
+        self.pushes += open.pushes
+        self.pops += open.pops
+        self.stale += open.stale
+        self.max_open = max(self.max_open, open.peak)
+        self.stop()
+
+    def add(self, other): #Totals of several searches, such as the sweeps of the shortest path mode
+        self.expanded += other.expanded
+        self.pushes += other.pushes
+        self.pops += other.pops
+        self.stale += other.stale
+        self.max_open = max(self.max_open, other.max_open)
+        self.search_time += other.search_time
+        self.observer_time += other.observer_time
+        self.draw_time += other.draw_time
+        self.octile += other.octile
+
+    def get_lines(self): #Short lines for the sidebar
+        return ['expanded %d' % self.expanded, 'max open %d' % self.max_open, 'heap ops %d' % (self.pushes + self.pops),
+                'stale %d' % self.stale, 'search %.0f ms' % (self.search_time*1000), 'draw %.0f ms' % (self.draw_time*1000)] + \
+               (['octile %d, %+.0f%%' % (self.octile, (self.expanded/self.octile - 1)*100)] if self.octile else [])
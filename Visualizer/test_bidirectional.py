@@ -0,0 +1,21 @@
+import random
+import grids
+import engine
+
+def test_same_cost_as_dijkstra():
+    for seed in range(30):
+        rng = random.Random(seed)
+        grid = grids.Grid(rng.choice((5, 12, 31)), rng.choice((3, 12, 31)))
+        cells = bytearray(grids.WALL if rng.random() < 0.3 else grids.DEFAULT for index in range(len(grid.cells)))
+        grid.set_board(cells, 0, len(grid.cells) - 1)
+        free = [grid.get_node_at(index) for index in range(len(grid.cells)) if grid.cells[index] != grids.WALL]
+        for query in range(10):
+            start, end = rng.choice(free), rng.choice(free)
+            best = engine.dijkstra(grid, start, end)[0]
+            for method in ('bi-astar', 'bi-dijkstra'):
+                for queue in ('heap', 'bucket', 'pairing'):
+                    cost, path, stats = engine.solve(grid, start, end, method, queue)
+                    assert cost == best, (seed, method, queue)
+                    if cost is not None: #From the end back to the start, one move at a time
+                        assert path[0] == end and path[-1] == start
+                        assert sum(dict(grid.table[grid.moves[a.index]])[b.index - a.index] for a, b in zip(path[::-1], path[::-1][1:])) == cost
@@ -0,0 +1,35 @@
+import random
+import grids
+import engine
+import flow
+
+def test_repairs_match_fresh_fields():
+    for seed in range(8):
+        rng = random.Random(seed)
+        grid = grids.Grid(rng.choice((8, 15, 24)), rng.choice((8, 15, 24)))
+        goal = grid.get_end().index
+        for step in range(40):
+            for edit in range(rng.randint(1, 4)): #Wall edits, never on the goal
+                index = rng.randrange(len(grid.cells))
+                node = grid.get_node_at(index)
+                if index != goal and not node.is_destination():
+                    node.set_default() if node.is_wall() else node.set_wall()
+            if rng.random() < 0.3: #The end moves
+                goal = rng.choice([index for index in range(len(grid.cells)) if grid.cells[index] != grids.WALL])
+            if rng.random() < 0.05: #A whole-board write
+                grid.set_cells(grid.cells)
+            field = flow.get_field(grid, goal)
+            fresh = flow.Field(grid, goal)
+            fresh.close()
+            assert field.distance == fresh.distance, (seed, step)
+            end = grid.get_node_at(goal)
+            for source in rng.sample(range(len(grid.cells)), 5):
+                if grid.cells[source] == grids.WALL:
+                    continue
+                best = engine.dijkstra(grid, grid.get_node_at(source), end)[0]
+                path = field.path(source)
+                assert (best if best is not None else flow.INF) == field.distance[source], (seed, step)
+                if path: #Every step is a move of the grid and they add up to the distance
+                    assert path[-1] == goal
+                    assert sum(dict(grid.table[grid.moves[a]])[b - a] for a, b in zip(path, path[1:])) == best
+                assert engine.solve(grid, grid.get_node_at(source), end, 'flow')[0] == best
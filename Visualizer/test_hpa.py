@@ -0,0 +1,65 @@
+import random
+import pytest
+import grids
+import engine
+import hpa
+
+def walk(grid, path): #Cost of a path, None if a step is not a move of the grid
+    cost = 0
+    for a, b in zip(path, path[1:]):
+        steps = dict(grid.table[grid.moves[a.index]])
+        if b.index - a.index not in steps:
+            return None
+        cost += steps[b.index - a.index]
+    return cost
+
+def check(grid, start, end):
+    best = engine.dijkstra(grid, start, end)[0]
+    cost, path, stats = hpa.hpa(grid, start, end)
+    assert (cost is None) == (best is None), (grid.cols, grid.rows, start.get_pos(), end.get_pos())
+    if cost is not None:
+        assert cost >= best
+        assert path[0] == end and path[-1] == start #Paths run from the end back
+        assert walk(grid, path) == cost
+
+def test_one_cluster_wide():
+    grid = grids.Grid(5, 15)
+    check(grid, grid.get_node((3, 12)), grid.get_node((0, 3)))
+    for cols, rows in ((1, 25), (10, 60), (25, 1), (60, 10)):
+        grid = grids.Grid(cols, rows)
+        check(grid, grid.get_start(), grid.get_end())
+
+def test_reachability_agrees_with_dijkstra():
+    for seed in range(30):
+        rng = random.Random(seed)
+        cols, rows = rng.choice((4, 10, 13, 31)), rng.choice((4, 10, 13, 31))
+        grid = grids.Grid(cols, rows)
+        cells = bytearray(grids.WALL if rng.random() < 0.3 else grids.DEFAULT for index in range(cols*rows))
+        grid.set_board(cells, 0, cols*rows - 1)
+        free = [grid.get_node_at(index) for index in range(cols*rows) if grid.cells[index] != grids.WALL]
+        for query in range(10):
+            check(grid, rng.choice(free), rng.choice(free))
+
+def test_route_is_lazy():
+    grid = grids.Grid(60)
+    cost, cells, stats = hpa.route(grid, grid.get_start(), grid.get_end())
+    abstraction = grid.caches['hpa']
+    assert next(cells) == grid.get_start().index
+    first = len(abstraction.paths)
+    assert [index for index in cells][-1] == grid.get_end().index
+    assert len(abstraction.paths) > first
+    assert hpa.route(grid, grid.get_start(), grid.get_end())[0] == hpa.hpa(grid, grid.get_start(), grid.get_end())[0] == cost
+
+def test_route_after_wall_edit():
+    #Walls painted across the grid after the first step, both before any edge is refined and once edges are cached
+    for cached in (False, True):
+        grid = grids.Grid(30)
+        if cached:
+            hpa.hpa(grid, grid.get_start(), grid.get_end())
+        cost, cells, stats = hpa.route(grid, grid.get_start(), grid.get_end())
+        next(cells)
+        for x in range(1, 30):
+            grid.get_node((x, 15)).set_wall()
+        with pytest.raises(RuntimeError):
+            list(cells)
+        check(grid, grid.get_start(), grid.get_end())
@@ -0,0 +1,35 @@
+import random
+import grids
+import engine
+import jps
+
+def reference(grid): #The tables built cell by cell with free() and forced()
+    tables = []
+    for dx, dy in jps.straight:
+        table = [0]*len(grid.cells)
+        for y in (range(grid.rows-1, -1, -1) if dy > 0 else range(grid.rows)):
+            for x in (range(grid.cols-1, -1, -1) if dx > 0 else range(grid.cols)):
+                nx, ny = x+dx, y+dy
+                if not jps.free(grid, nx, ny):
+                    continue
+                if jps.forced(grid, nx, ny, dx, dy):
+                    table[y*grid.cols + x] = 1
+                else:
+                    ahead = table[ny*grid.cols + nx]
+                    table[y*grid.cols + x] = ahead + 1 if ahead > 0 else ahead - 1
+        tables.append(table)
+    return tables
+
+def test_tables_follow_wall_edits():
+    for seed in range(10):
+        rng = random.Random(seed)
+        grid = grids.Grid(rng.choice((1, 6, 17, 30)), rng.choice((2, 6, 17, 30)))
+        assert jps.get_tables(grid) == reference(grid)
+        for step in range(40):
+            for edit in range(rng.randint(1, 3)): #Several edits between queries
+                node = grid.get_node_at(rng.randrange(len(grid.cells)))
+                if not node.is_destination():
+                    node.set_default() if node.is_wall() else node.set_wall()
+            assert jps.get_tables(grid) == reference(grid), (seed, step)
+            start, end = grid.get_start(), grid.get_end()
+            assert engine.jps(grid, start, end)[0] == engine.dijkstra(grid, start, end)[0], (seed, step)
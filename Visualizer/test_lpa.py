@@ -0,0 +1,30 @@
+import random
+import grids
+import engine
+import lpa
+
+def walk(grid, path): #Cost of a run of indices, one move at a time
+    return sum(dict(grid.table[grid.moves[a]])[b - a] for a, b in zip(path, path[1:]))
+
+def test_repairs_match_fresh_searches():
+    for seed in range(8):
+        rng = random.Random(seed)
+        grid = grids.Grid(rng.choice((8, 15, 24)), rng.choice((8, 15, 24)))
+        start = grid.get_start()
+        goal = grid.get_end().index
+        for step in range(40):
+            for edit in range(rng.randint(1, 4)): #Wall edits, never on the start or the goal
+                index = rng.randrange(len(grid.cells))
+                node = grid.get_node_at(index)
+                if index not in (start.index, goal) and not node.is_destination():
+                    node.set_default() if node.is_wall() else node.set_wall()
+            if rng.random() < 0.3: #The end moves
+                goal = rng.choice([index for index in range(len(grid.cells)) if grid.cells[index] != grids.WALL])
+            if rng.random() < 0.05: #A whole-board write
+                grid.set_cells(grid.cells)
+            cost, path, stats = lpa.get_planner(grid, start.index).find(goal)
+            fresh = lpa.Planner(grid, start.index)
+            assert cost == fresh.find(goal)[0] == engine.dijkstra(grid, start, grid.get_node_at(goal))[0], (seed, step)
+            fresh.close()
+            if cost is not None:
+                assert path[0] == goal and path[-1] == start.index and walk(grid, path) == cost
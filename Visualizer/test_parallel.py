@@ -0,0 +1,42 @@
+import random
+import grids
+import engine
+import parallel
+
+def board(seed, cols=15, rows=12): #Random walls, start and end moved off the corners so the corners can be walls
+    grid = grids.Grid(cols, rows)
+    rng = random.Random(seed)
+    cells = bytearray(grids.WALL if rng.random() < 0.3 else grids.DEFAULT for index in range(cols*rows))
+    start, end = rng.sample(range(cols*rows), 2)
+    cells[0] = cells[-1] = grids.WALL
+    grid.set_board(cells, start, end)
+    return grid
+
+def sequential(grid, jobs):
+    results = {}
+    for source, targets in jobs:
+        found, stats = engine.search_many(grid, source, targets)
+        results[source] = {target: (cost, path) for target, (cost, path) in found.items()}
+    return results
+
+def test_corner_walls():
+    #Start at (0,2), walls at (0,0) and along x=1 but (1,0): the only way out is through the walled corner
+    grid = grids.Grid(5)
+    cells = bytearray(25)
+    cells[0] = grids.WALL
+    for y in range(1, 5):
+        cells[y*5 + 1] = grids.WALL
+    grid.set_board(cells, 10, 24)
+    jobs = [(grid.get_start(), [grid.get_end()])]
+    assert sequential(grid, jobs) == {grid.get_start(): {}}
+    assert parallel.search_pairs(grid, jobs)[0][1] == {}
+
+def test_same_as_sequential():
+    for seed in range(10):
+        grid = board(seed)
+        rng = random.Random(seed)
+        free = [grid.get_node_at(index) for index in range(len(grid.cells)) if grid.moves[index]]
+        sources = rng.sample(free, 4)
+        jobs = [(source, sources[i+1:] + [grid.get_end()]) for i, source in enumerate(sources)]
+        found = {source: {target: cost for target, (cost, path) in reached.items()} for source, reached, stats in parallel.search_pairs(grid, jobs)}
+        assert found == {source: {target: cost for target, (cost, path) in reached.items()} for source, reached in sequential(grid, jobs).items()}
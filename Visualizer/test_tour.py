@@ -0,0 +1,40 @@
+import random
+from itertools import permutations
+import tour
+
+def matrix(rng, n): #Symmetric, 0 on the diagonal
+    dist = [[0]*n for i in range(n)]
+    for a in range(n):
+        for b in range(a+1, n):
+            dist[a][b] = dist[b][a] = rng.randint(1, 100)
+    return dist
+
+def brute_force(dist, start, end):
+    stops = [stop for stop in range(len(dist)) if stop != start and stop != end]
+    return min(tour.route_cost(dist, [start] + list(order) + [end]) for order in permutations(stops))
+
+def test_unreachable_stop():
+    dist = matrix(random.Random(0), 5)
+    for other in range(5):
+        if other != 2:
+            dist[2][other] = dist[other][2] = tour.INF
+    route, cost = tour.solve(dist, 0, 4)
+    assert cost == tour.INF
+    assert route[0] == 0 and route[-1] == 4 and sorted(route) == list(range(5))
+
+def test_held_karp_is_optimal():
+    rng = random.Random(1)
+    for n in range(2, 9):
+        for trial in range(5):
+            dist = matrix(rng, n)
+            route, cost = tour.solve(dist, 0, n-1)
+            assert cost == brute_force(dist, 0, n-1) == tour.route_cost(dist, route)
+            assert route[0] == 0 and route[-1] == n-1 and sorted(route) == list(range(n))
+
+def test_heuristic_route():
+    rng = random.Random(2)
+    for n in range(4, 9):
+        dist = matrix(rng, n)
+        route, cost = tour.solve(dist, 0, n-1, exact=0)
+        assert sorted(route) == list(range(n)) and route[0] == 0 and route[-1] == n-1
+        assert cost == tour.route_cost(dist, route) >= brute_force(dist, 0, n-1)
@@ -0,0 +1,109 @@
+from operator import add
+
+#Orders the stops of a route: start at `start`, visit every other index of the matrix once, finish at `end`
+#dist is a dense symmetric matrix (list of lists), unknown entries can be float('inf')
+#Up to `exact` intermediate stops the order is optimal (Held-Karp), above that it is a 2-opt/Or-opt improved nearest neighbor tour
+
+INF = float('inf')
+EXACT = 16
+
+def route_cost(dist, route):
+    return sum(dist[route[i]][route[i+1]] for i in range(len(route)-1))
+
+def held_karp(dist, start, end, stops):
+    m = len(stops)
+    #dp[mask][k]: cheapest way from start through the stops in mask, ending at stops[k] (inf if k is not in mask)
+    cols = [[dist[a][b] for a in stops] for b in stops] #cols[k][j] = dist[stops[j]][stops[k]]
+    dp = [None]*(1<<m)
+    for k in range(m):
+        row = [INF]*m
+        row[k] = dist[start][stops[k]]
+        dp[1<<k] = row
+    for mask in range(1, 1<<m):
+        if mask & (mask-1) == 0:
+            continue
+        row = [INF]*m
+        bits = mask
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            k = bit.bit_length() - 1
+            row[k] = min(map(add, dp[mask ^ bit], cols[k]))
+        dp[mask] = row
+    mask = (1<<m) - 1
+    last = [dp[mask][k] + dist[stops[k]][end] for k in range(m)]
+    cost = min(last)
+    if cost == INF: #Some stop is unreachable, there is no route to walk back
+        return [start] + stops + [end], INF
+    k = last.index(cost)
+    order = []
+    while True: #Walk the table backwards
+        order.append(stops[k])
+        previous = mask ^ (1<<k)
+        if not previous:
+            break
+        candidates = list(map(add, dp[previous], cols[k]))
+        mask, k = previous, candidates.index(dp[mask][k])
+    order.reverse()
+    return [start] + order + [end], cost
+
+def nearest_neighbor(dist, start, end, stops):
+    route = [start]
+    left = set(stops)
+    while left:
+        current = route[-1]
+        closest = min(left, key=lambda stop: dist[current][stop])
+        left.remove(closest)
+        route.append(closest)
+    return route + [end]
+
+def two_opt(dist, route): #Reverse route[i:j+1] while it shortens the route, the two ends stay fixed
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route)-2):
+            for j in range(i+1, len(route)-1):
+                a, b, c, d = route[i-1], route[i], route[j], route[j+1]
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d]:
+                    route[i:j+1] = reversed(route[i:j+1])
+                    improved = True
+    return route
+
+def or_opt(dist, route): #Move runs of 1 to 3 stops (either way round) to a better place
+    improved = True
+    while improved:
+        improved = False
+        for length in (1, 2, 3):
+            for i in range(1, len(route)-length):
+                segment = route[i:i+length]
+                rest = route[:i] + route[i+length:]
+                removed = dist[route[i-1]][segment[0]] + dist[segment[-1]][route[i+length]] - dist[route[i-1]][route[i+length]]
+                best, place = 0, None
+                for j in range(len(rest)-1):
+                    a, b = rest[j], rest[j+1]
+                    for run in (segment, segment[::-1]):
+                        gain = removed - (dist[a][run[0]] + dist[run[-1]][b] - dist[a][b])
+                        if gain > best:
+                            best, place = gain, (j, run)
+                if place:
+                    j, run = place
+                    route[:] = rest[:j+1] + run + rest[j+1:]
+                    improved = True
+                    break
+            if improved:
+                break
+    return route
+
+def solve(dist, start, end, exact=EXACT): #Returns (route, cost), route runs from start to end through every index
+    stops = [stop for stop in range(len(dist)) if stop != start and stop != end]
+    if not stops:
+        return [start, end], dist[start][end]
+    if len(stops) <= exact:
+        return held_karp(dist, start, end, stops)
+    route = nearest_neighbor(dist, start, end, stops)
+    improved = True
+    while improved:
+        cost = route_cost(dist, route)
+        or_opt(dist, two_opt(dist, route))
+        improved = route_cost(dist, route) < cost
+    return route, route_cost(dist, route)
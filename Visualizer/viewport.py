@@ -0,0 +1,55 @@
+#Window onto the grid: which cells are on screen and how big they are drawn
+#(x, y) is the cell in the top left corner, size the cell side in pixels, width the side of the drawing area
+
+class Viewport:
+    def __init__(self, cols, rows, width, size, min_size=2, max_size=48):
+        self.cols, self.rows = cols, rows
+        self.width = width
+        self.min_size, self.max_size = min_size, max_size
+        self.size = min(max(size, min_size), max_size)
+        self.x = self.y = 0
+
+    def span(self): #Number of cells across the drawing area
+        return -(-self.width//self.size)
+
+    def visible(self): #x range and y range of the cells on screen
+        span = self.span()
+        return range(self.x, min(self.x + span, self.cols)), range(self.y, min(self.y + span, self.rows))
+
+    def is_visible(self, pos):
+        x, y = pos
+        return 0 <= x - self.x < self.span() and 0 <= y - self.y < self.span()
+
+    def to_cell(self, pixel): #Cell under a pixel of the drawing area, None outside the grid
+        px, py = pixel
+        if not (0 <= px < self.width and 0 <= py < self.width):
+            return None
+        x, y = self.x + px//self.size, self.y + py//self.size
+        if x < self.cols and y < self.rows:
+            return x, y
+        return None
+
+    def to_pixel(self, pos): #Top left pixel of a cell
+        x, y = pos
+        return (x - self.x)*self.size, (y - self.y)*self.size
+
+    def clamp(self):
+        span = self.span()
+        self.x = max(0, min(self.x, self.cols - span))
+        self.y = max(0, min(self.y, self.rows - span))
+
+    def pan(self, dx, dy): #Move by a number of cells
+        self.x += dx
+        self.y += dy
+        self.clamp()
+
+    def zoom(self, step, pixel=None): #Grow or shrink the cells by step pixels, keeping the cell under pixel in place
+        size = min(max(self.size + step, self.min_size), self.max_size)
+        if size == self.size:
+            return
+        px, py = pixel if pixel else (self.width//2, self.width//2)
+        cx, cy = self.x + px/self.size, self.y + py/self.size
+        self.size = size
+        self.x = int(cx - px/size)
+        self.y = int(cy - py/size)
+        self.clamp()
@@ -0,0 +1,53 @@
+import queue
+import threading
+
+#Background jobs for the visualizer: a search or maze generator runs on its own thread while the window keeps drawing and taking input
+#The job only talks to the window through a queue of (index, state) event batches, the window plays them with Frames
+#Cancelling sets the job's token, the job sees it on its next emit and stops: searches stop when their observer returns CANCELLED
+
+AHEAD = 1024 #Batches the job may get ahead of the window, emit waits while the queue is full
+CANCELLED = 1 #Escape code emit returns once the job is cancelled, the searches return it as is
+
+class Job:
+    def __init__(self, function, *args): #Runs function(*args, job) on a new thread
+        self.token = threading.Event() #Set to cancel
+        self.finished = threading.Event() #Set once the function returned and every batch is queued
+        self.batches = queue.Queue(AHEAD)
+        self.result = None
+        self.error = None #Exception the function raised, for the window thread to raise again
+        self.thread = threading.Thread(target=self.run, args=(function, args), name='job', daemon=True)
+        self.thread.start()
+
+    def run(self, function, args):
+        try:
+            self.result = function(*args, self)
+        except Exception as error:
+            self.error = error
+        self.finished.set()
+
+    def emit(self, events): #Called by the job, returns 0 or CANCELLED
+        while not self.token.is_set():
+            try:
+                self.batches.put(events, timeout=0.05)
+                return 0
+            except queue.Full: #The window is behind, wait for it
+                pass
+        return CANCELLED
+
+    def get(self): #Called by the window, the next batch or None if there is none yet
+        try:
+            return self.batches.get_nowait()
+        except queue.Empty:
+            return None
+
+    def is_empty(self): #No batch waiting for the window
+        return self.batches.empty()
+
+    def cancel(self):
+        self.token.set()
+
+    def is_cancelled(self):
+        return self.token.is_set()
+
+    def is_finished(self):
+        return self.finished.is_set()